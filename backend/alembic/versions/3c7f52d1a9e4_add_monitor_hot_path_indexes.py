@@ -0,0 +1,26 @@
+"""add monitor hot path indexes
+
+Revision ID: 3c7f52d1a9e4
+Revises: 9a1306627ed4
+Create Date: 2026-10-16 09:12:41.518203
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3c7f52d1a9e4'
+down_revision: Union[str, None] = '9a1306627ed4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bonuses_mt5_status_type', 'bonuses', ['mt5_login', 'status', 'bonus_type'], unique=False)
+    op.create_index('ix_monitored_accounts_active_polled', 'monitored_accounts', ['is_active', 'last_polled_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_monitored_accounts_active_polled', table_name='monitored_accounts')
+    op.drop_index('ix_bonuses_mt5_status_type', table_name='bonuses')
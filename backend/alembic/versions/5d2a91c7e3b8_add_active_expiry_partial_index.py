@@ -0,0 +1,28 @@
+"""add active expiry partial index
+
+Revision ID: 5d2a91c7e3b8
+Revises: b84e0f6d2c17
+Create Date: 2026-10-16 11:24:05.118342
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5d2a91c7e3b8'
+down_revision: Union[str, None] = 'b84e0f6d2c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_bonuses_active_expires_at', 'bonuses', ['expires_at'], unique=False,
+        postgresql_where=sa.text("status = 'ACTIVE' AND expires_at IS NOT NULL"),
+        sqlite_where=sa.text("status = 'ACTIVE' AND expires_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bonuses_active_expires_at', table_name='bonuses')
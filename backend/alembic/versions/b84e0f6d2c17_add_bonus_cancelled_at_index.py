@@ -0,0 +1,24 @@
+"""add bonus cancelled_at index
+
+Revision ID: b84e0f6d2c17
+Revises: 3c7f52d1a9e4
+Create Date: 2026-10-16 10:02:17.334820
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b84e0f6d2c17'
+down_revision: Union[str, None] = '3c7f52d1a9e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bonuses_status_cancelled_at', 'bonuses', ['status', 'cancelled_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bonuses_status_cancelled_at', table_name='bonuses')
@@ -19,8 +19,8 @@ from app.schemas.bonus import (
     LotProgressRead,
 )
 from app.schemas.common import PaginatedResponse
+from app.services.account_locks import login_lock
 from app.services.bonus_engine import assign_bonus, cancel_bonus, check_eligibility, check_eligibility_all
-from app.services.lot_tracker import process_deal
 
 router = APIRouter(prefix="/api/bonuses", tags=["bonuses"])
 
@@ -137,20 +137,24 @@ async def assign_bonus_manual(
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    failures = await check_eligibility_all(db, campaign, body.mt5_login, body.deposit_amount)
-    if failures:
-        if not body.override_eligibility:
-            # Return 409 with all failures so the frontend can prompt for override
-            raise HTTPException(status_code=409, detail={
-                "message": "Eligibility checks failed",
-                "failures": failures,
-            })
-        # Override requested — block non-overridable failures
-        non_overridable = [f for f in failures if not f["overridable"]]
-        if non_overridable:
-            raise HTTPException(status_code=400, detail=non_overridable[0]["message"])
-
-    bonus = await assign_bonus(db, campaign, body.mt5_login, body.deposit_amount, actor_id=user.id)
+    async with login_lock(body.mt5_login):
+        # Check under the lock, so two concurrent assigns can't both pass the
+        # one-per-campaign and max-concurrent checks
+        failures = await check_eligibility_all(db, campaign, body.mt5_login, body.deposit_amount)
+        if failures:
+            if not body.override_eligibility:
+                # Return 409 with all failures so the frontend can prompt for override
+                raise HTTPException(status_code=409, detail={
+                    "message": "Eligibility checks failed",
+                    "failures": failures,
+                })
+            # Override requested — block non-overridable failures
+            non_overridable = [f for f in failures if not f["overridable"]]
+            if non_overridable:
+                raise HTTPException(status_code=400, detail=non_overridable[0]["message"])
+
+        bonus = await assign_bonus(db, campaign, body.mt5_login, body.deposit_amount, actor_id=user.id)
+        await db.commit()
     item = BonusRead.model_validate(bonus)
     item.campaign_name = campaign.name
     return item
@@ -166,10 +170,14 @@ async def cancel_bonus_endpoint(
     bonus = await db.get(Bonus, bonus_id)
     if not bonus:
         raise HTTPException(status_code=404, detail="Bonus not found")
-    if bonus.status != BonusStatus.ACTIVE:
-        raise HTTPException(status_code=400, detail="Bonus is not active")
 
-    bonus = await cancel_bonus(db, bonus, body.reason, actor_id=user.id)
+    async with login_lock(bonus.mt5_login):
+        # Re-read under the lock: the monitor may have just cancelled it
+        await db.refresh(bonus)
+        if bonus.status != BonusStatus.ACTIVE:
+            raise HTTPException(status_code=400, detail="Bonus is not active")
+        bonus = await cancel_bonus(db, bonus, body.reason, actor_id=user.id)
+        await db.commit()
     return BonusRead.model_validate(bonus)
 
 
@@ -182,18 +190,22 @@ async def force_convert(
     bonus = await db.get(Bonus, bonus_id)
     if not bonus:
         raise HTTPException(status_code=404, detail="Bonus not found")
-    if bonus.bonus_type != "C" or bonus.status != BonusStatus.ACTIVE:
-        raise HTTPException(status_code=400, detail="Not an active Type C bonus")
-
-    remaining = bonus.bonus_amount - bonus.amount_converted
-    if remaining > 0:
-        await gateway.remove_credit(bonus.mt5_login, remaining, "Force convert")
-        await gateway.deposit_to_balance(bonus.mt5_login, remaining, "Force convert")
-
-    bonus.amount_converted = bonus.bonus_amount
-    bonus.lots_traded = bonus.lots_required or bonus.lots_traded
-    bonus.status = BonusStatus.CONVERTED
-    await db.flush()
+
+    async with login_lock(bonus.mt5_login):
+        # Re-read under the lock: the monitor may have just converted or cancelled it
+        await db.refresh(bonus)
+        if bonus.bonus_type != "C" or bonus.status != BonusStatus.ACTIVE:
+            raise HTTPException(status_code=400, detail="Not an active Type C bonus")
+
+        remaining = bonus.bonus_amount - bonus.amount_converted
+        if remaining > 0:
+            await gateway.remove_credit(bonus.mt5_login, remaining, "Force convert")
+            await gateway.deposit_to_balance(bonus.mt5_login, remaining, "Force convert")
+
+        bonus.amount_converted = bonus.bonus_amount
+        bonus.lots_traded = bonus.lots_required or bonus.lots_traded
+        bonus.status = BonusStatus.CONVERTED
+        await db.commit()
     return BonusRead.model_validate(bonus)
 
 
@@ -210,7 +222,14 @@ async def override_leverage(
     if bonus.bonus_type != "A":
         raise HTTPException(status_code=400, detail="Not a Type A bonus")
 
-    await gateway.set_leverage(bonus.mt5_login, body.new_leverage)
-    bonus.adjusted_leverage = body.new_leverage
-    await db.flush()
+    async with login_lock(bonus.mt5_login):
+        # Re-read under the lock: a drawdown or withdrawal may have just
+        # cancelled it and restored the original leverage
+        await db.refresh(bonus)
+        if bonus.status != BonusStatus.ACTIVE:
+            raise HTTPException(status_code=400, detail="Bonus is not active")
+
+        await gateway.set_leverage(bonus.mt5_login, body.new_leverage)
+        bonus.adjusted_leverage = body.new_leverage
+        await db.commit()
     return BonusRead.model_validate(bonus)
@@ -17,6 +17,7 @@ from app.schemas.campaign import (
     CampaignUpdate,
 )
 from app.schemas.common import PaginatedResponse
+from app.services.campaign_cache import invalidate_campaign_cache
 
 router = APIRouter(prefix="/api/campaigns", tags=["campaigns"])
 
@@ -79,7 +80,7 @@ async def create_campaign(
 ):
     campaign = Campaign(**body.model_dump(), created_by_id=user.id)
     db.add(campaign)
-    await db.flush()
+    await _commit_and_invalidate(db)
     await db.refresh(campaign)
     return CampaignRead.model_validate(campaign)
 
@@ -120,7 +121,7 @@ async def update_campaign(
     for field, value in update_data.items():
         setattr(campaign, field, value)
 
-    await db.flush()
+    await _commit_and_invalidate(db)
     await db.refresh(campaign)
     return CampaignRead.model_validate(campaign)
 
@@ -147,7 +148,7 @@ async def duplicate_campaign(
 
     new_campaign = Campaign(**data)
     db.add(new_campaign)
-    await db.flush()
+    await _commit_and_invalidate(db)
     await db.refresh(new_campaign)
     return CampaignRead.model_validate(new_campaign)
 
@@ -165,6 +166,13 @@ async def update_campaign_status(
         raise HTTPException(status_code=404, detail="Campaign not found")
 
     campaign.status = body.status
-    await db.flush()
+    await _commit_and_invalidate(db)
     await db.refresh(campaign)
     return CampaignRead.model_validate(campaign)
+
+
+async def _commit_and_invalidate(db: AsyncSession):
+    # Commit before invalidating so a concurrent cache reload can't pick up
+    # the pre-change state and keep it for a full TTL
+    await db.commit()
+    invalidate_campaign_cache()
@@ -6,7 +6,7 @@ from app.api.deps import get_current_user, require_roles
 from app.db.database import get_db
 from app.models.monitored_account import MonitoredAccount
 from app.models.user import AdminRole, AdminUser
-from app.services.monitor_service import register_for_monitoring
+from app.services.monitor_registry import get_monitored_account, register_for_monitoring
 
 router = APIRouter(prefix="/api/monitoring", tags=["monitoring"])
 
@@ -45,10 +45,7 @@ async def reset_errors(
     user: AdminUser = Depends(require_roles(AdminRole.SUPER_ADMIN)),
 ):
     """Reset consecutive error counter for a stuck account."""
-    result = await db.execute(
-        select(MonitoredAccount).where(MonitoredAccount.mt5_login == mt5_login)
-    )
-    mon = result.scalar_one_or_none()
+    mon = await get_monitored_account(db, mt5_login)
     if not mon:
         raise HTTPException(404, "Account not monitored")
     mon.consecutive_errors = 0
@@ -63,7 +60,7 @@ async def monitoring_status(
     db: AsyncSession = Depends(get_db),
     user: AdminUser = Depends(get_current_user),
 ):
-    from app.tasks.scheduler import scheduler
+    from app.tasks.scheduler import monitor_running, scheduler
 
     total = (await db.execute(
         select(func.count(MonitoredAccount.id))
@@ -79,13 +76,12 @@ async def monitoring_status(
         )
     )).scalar() or 0
 
-    monitor_job = scheduler.get_job("account_monitor")
     return {
         "total_accounts": total,
         "active_accounts": active,
         "errored_accounts": errored,
         "scheduler_running": scheduler.running,
-        "next_run": str(monitor_job.next_run_time) if monitor_job else None,
+        "monitor_running": monitor_running(),
     }
 
 
@@ -2,7 +2,7 @@ import io
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -51,10 +51,16 @@ async def cancellation_report(
 
 @router.get("/leverage")
 async def leverage_report(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="bonus_id to continue after"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
     db: AsyncSession = Depends(get_db),
     user: AdminUser = Depends(get_current_user),
 ):
-    return await get_leverage_report(db)
+    rows = await get_leverage_report(db, after_id=cursor, limit=limit)
+    if limit and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1]["bonus_id"])
+    return rows
 
 
 @router.get("/export")
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
+from app.services.account_locks import login_lock
 from app.services.trigger_service import (
     process_deposit_trigger,
     process_promo_code_trigger,
@@ -32,19 +33,25 @@ class PromoCodeEvent(BaseModel):
 
 @router.post("/deposit")
 async def deposit_trigger(body: DepositEvent, db: AsyncSession = Depends(get_db)):
-    results = await process_deposit_trigger(db, body.mt5_login, body.deposit_amount, body.agent_code)
+    async with login_lock(body.mt5_login):
+        results = await process_deposit_trigger(db, body.mt5_login, body.deposit_amount, body.agent_code)
+        await db.commit()
     return {"results": results}
 
 
 @router.post("/registration")
 async def registration_trigger(body: RegistrationEvent, db: AsyncSession = Depends(get_db)):
-    results = await process_registration_trigger(db, body.mt5_login)
+    async with login_lock(body.mt5_login):
+        results = await process_registration_trigger(db, body.mt5_login)
+        await db.commit()
     return {"results": results}
 
 
 @router.post("/promo-code")
 async def promo_code_trigger(body: PromoCodeEvent, db: AsyncSession = Depends(get_db)):
-    results = await process_promo_code_trigger(
-        db, body.mt5_login, body.promo_code, body.deposit_amount
-    )
+    async with login_lock(body.mt5_login):
+        results = await process_promo_code_trigger(
+            db, body.mt5_login, body.promo_code, body.deposit_amount
+        )
+        await db.commit()
     return {"results": results}
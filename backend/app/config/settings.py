@@ -17,6 +17,11 @@ class Settings(BaseSettings):
     MT5_MANAGER_PASSWORD: Optional[str] = None    # Manager password
     MT5_REQUEST_TIMEOUT_SECONDS: int = 30
 
+    # Account monitor
+    MONITOR_POLL_CONCURRENCY: int = 16            # Accounts polled in parallel (forced to 1 on SQLite)
+    MONITOR_FULL_SWEEP_SECONDS: int = 300         # Full poll interval for gateways that push account changes
+    MONITOR_IDLE_WAKE_SECONDS: float = 5.0        # Longest the monitor waits for a pushed change before checking in
+
     @property
     def mt5_configured(self) -> bool:
         return all([self.MT5_BRIDGE_URL, self.MT5_SERVER, self.MT5_MANAGER_LOGIN, self.MT5_MANAGER_PASSWORD])
@@ -2,9 +2,14 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 
 from app.config.settings import settings
 
-_engine_kwargs = {"echo": False}
+# The trigger, monitor and expiry paths issue a few statement shapes over and
+# over; a larger compiled cache keeps them from being evicted and recompiled.
+_engine_kwargs = {"echo": False, "query_cache_size": 1200}
 if "sqlite" not in settings.DATABASE_URL:
     _engine_kwargs.update({"pool_size": 20, "max_overflow": 10})
+if "asyncpg" in settings.DATABASE_URL:
+    # Reuse prepared statements per connection instead of re-parsing them
+    _engine_kwargs["connect_args"] = {"prepared_statement_cache_size": 1024}
 
 engine = create_async_engine(settings.DATABASE_URL, **_engine_kwargs)
 
@@ -1,6 +1,8 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 
 @dataclass
@@ -39,6 +41,37 @@ class MT5BalanceDeal:
 
 
 class MT5Gateway(ABC):
+    # True when the gateway itself reports which accounts changed (see
+    # drain_changed_logins), letting the monitor poll only those accounts.
+    pushes_changes: bool = False
+
+    # How long get_account_info_cached may reuse a snapshot
+    ACCOUNT_CACHE_TTL_SECONDS: float = 0.5
+
+    # Most single-account requests the default get_account_info_batch keeps
+    # in flight at once
+    ACCOUNT_BATCH_CONCURRENCY: int = 16
+
+    def __init__(self):
+        self._account_cache: Dict[str, Tuple[float, MT5Account]] = {}
+        # Bumped on every invalidation, so a read that overlapped a write
+        # isn't stored as fresh
+        self._account_generations: Dict[str, int] = {}
+
+    def drain_changed_logins(self) -> Set[str]:
+        """Return and clear the logins changed since the last call."""
+        return set()
+
+    def requeue_changed_logins(self, logins: Set[str]) -> None:
+        """Put drained logins back, e.g. after a monitor cycle failed to poll them."""
+
+    async def wait_for_changes(self, timeout: float) -> None:
+        """Return once an account changes, or after `timeout` seconds.
+
+        Gateways that don't push changes can't tell, so they just sleep.
+        """
+        await asyncio.sleep(timeout)
+
     @abstractmethod
     async def get_account_info(self, login: str) -> Optional[MT5Account]:
         pass
@@ -90,3 +123,65 @@ class MT5Gateway(ABC):
     ) -> List["MT5BalanceDeal"]:
         """Return balance operations (deposits/withdrawals), excluding trades and credit ops."""
         pass
+
+    async def get_account_info_cached(self, login: str) -> Optional[MT5Account]:
+        """Like get_account_info, but reuses a snapshot up to ACCOUNT_CACHE_TTL_SECONDS old.
+
+        For reads that can live with that staleness, such as eligibility
+        checks; writes made through this gateway drop the login's entry.
+        """
+        now = time.monotonic()
+        cached = self._account_cache.get(login)
+        if cached is not None and now - cached[0] < self.ACCOUNT_CACHE_TTL_SECONDS:
+            return cached[1]
+        generation = self._account_generations.get(login, 0)
+        account = await self.get_account_info(login)
+        if account is not None and self._account_generations.get(login, 0) == generation:
+            self._account_cache[login] = (now, account)
+        return account
+
+    def _invalidate_account(self, login: str) -> None:
+        self._account_generations[login] = self._account_generations.get(login, 0) + 1
+        self._account_cache.pop(login, None)
+
+    async def get_account_info_batch(self, logins: List[str]) -> Dict[str, MT5Account]:
+        """Fetch several accounts at once, keyed by login; missing accounts are left out.
+
+        The default issues the single-account requests concurrently, at most
+        ACCOUNT_BATCH_CONCURRENCY at a time; gateways with a bulk lookup should
+        override it.
+        """
+        semaphore = asyncio.Semaphore(self.ACCOUNT_BATCH_CONCURRENCY)
+
+        async def fetch(login: str) -> Optional[MT5Account]:
+            async with semaphore:
+                return await self.get_account_info(login)
+
+        accounts = await asyncio.gather(*(fetch(login) for login in logins))
+        return {login: account for login, account in zip(logins, accounts) if account is not None}
+
+    async def wait_for_account(
+        self,
+        login: str,
+        predicate: Callable[[MT5Account], bool],
+        timeout: float = 2.0,
+    ) -> Optional[MT5Account]:
+        """Wait until the account satisfies `predicate`, or `timeout` seconds pass.
+
+        Returns the latest account snapshot (or None if the account is gone).
+        The default re-reads the account with a short exponential backoff so
+        callers resume as soon as MT5 reflects a change; gateways with a push
+        feed can override this to resolve on the change event instead.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.05
+        while True:
+            account = await self.get_account_info(login)
+            if account is None or predicate(account):
+                return account
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return account
+            await asyncio.sleep(min(delay, remaining))
+            delay *= 2
@@ -1,18 +1,45 @@
+import asyncio
 import time
 import random
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 from app.gateway.interface import MT5Account, MT5BalanceDeal, MT5Deal, MT5Gateway
 
 
 class MockMT5Gateway(MT5Gateway):
+    # Every account change goes through this object, so it can report them all
+    pushes_changes = True
+
     def __init__(self):
+        super().__init__()
         self.accounts: Dict[str, MT5Account] = {}
         self.deals: Dict[str, List[MT5Deal]] = {}
         self._balance_deals: Dict[str, List[MT5BalanceDeal]] = {}
+        self._changed: Set[str] = set()
+        self._changes_event = asyncio.Event()
         self._deal_counter = 1000
         self._seed_accounts()
 
+    def drain_changed_logins(self) -> Set[str]:
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def requeue_changed_logins(self, logins: Set[str]) -> None:
+        # No wake-up: a failing cycle retries on the next idle wake, not in a tight loop
+        self._changed |= logins
+
+    async def wait_for_changes(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._changes_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._changes_event.clear()
+
+    def _mark_changed(self, login: str) -> None:
+        self._changed.add(login)
+        self._invalidate_account(login)
+        self._changes_event.set()
+
     def _seed_accounts(self):
         test_accounts = [
             ("10001", 5000.0, 500, "demo\\standard", "US", "John Doe", "IB001"),
@@ -43,12 +70,16 @@ class MockMT5Gateway(MT5Gateway):
     async def get_account_info(self, login: str) -> Optional[MT5Account]:
         return self.accounts.get(login)
 
+    async def get_account_info_batch(self, logins: List[str]) -> Dict[str, MT5Account]:
+        return {login: self.accounts[login] for login in logins if login in self.accounts}
+
     async def post_credit(self, login: str, amount: float, comment: str) -> bool:
         acct = self.accounts.get(login)
         if not acct:
             return False
         acct.credit += amount
         acct.equity += amount
+        self._mark_changed(login)
         return True
 
     async def remove_credit(self, login: str, amount: float, comment: str) -> bool:
@@ -57,6 +88,7 @@ class MockMT5Gateway(MT5Gateway):
             return False
         acct.credit = max(0, acct.credit - amount)
         acct.equity = acct.balance + acct.credit
+        self._mark_changed(login)
         return True
 
     async def set_leverage(self, login: str, leverage: int) -> bool:
@@ -64,6 +96,7 @@ class MockMT5Gateway(MT5Gateway):
         if not acct:
             return False
         acct.leverage = leverage
+        self._mark_changed(login)
         return True
 
     async def deposit_to_balance(self, login: str, amount: float, comment: str) -> bool:
@@ -73,6 +106,7 @@ class MockMT5Gateway(MT5Gateway):
         acct.balance += amount
         acct.credit = max(0, acct.credit - amount)
         acct.equity = acct.balance + acct.credit
+        self._mark_changed(login)
         return True
 
     async def get_trade_history(
@@ -118,6 +152,7 @@ class MockMT5Gateway(MT5Gateway):
         if acct:
             acct.balance += amount
             acct.equity += amount
+        self._mark_changed(login)
         return deal
 
     def simulate_deal(self, login: str, symbol: str = "EURUSD", lots: float = 1.0) -> MT5Deal:
@@ -135,6 +170,7 @@ class MockMT5Gateway(MT5Gateway):
         if login not in self.deals:
             self.deals[login] = []
         self.deals[login].append(deal)
+        self._mark_changed(login)
         return deal
 
 
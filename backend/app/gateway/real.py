@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 import httpx
@@ -26,6 +27,7 @@ class RealMT5Gateway(MT5Gateway):
         manager_password: str,
         request_timeout: int = 30,
     ):
+        super().__init__()
         self._bridge_url = bridge_url.rstrip("/")
         self._mt5_server = mt5_server
         self._manager_login = manager_login
@@ -121,6 +123,7 @@ class RealMT5Gateway(MT5Gateway):
         try:
             resp = await self._get("/Deposit",
                 login=int(login), amount=amount, comment=comment, credit=True)
+            self._invalidate_account(login)
             logger.info("MT5 credit posted: login=%s amount=%.2f ticket=%s", login, amount, resp.text.strip())
             return True
         except MT5ManagerAPIError:
@@ -131,6 +134,7 @@ class RealMT5Gateway(MT5Gateway):
         try:
             resp = await self._get("/Deposit",
                 login=int(login), amount=-abs(amount), comment=comment, credit=True)
+            self._invalidate_account(login)
             logger.info("MT5 credit removed: login=%s amount=%.2f ticket=%s", login, amount, resp.text.strip())
             return True
         except MT5ManagerAPIError:
@@ -140,6 +144,7 @@ class RealMT5Gateway(MT5Gateway):
     async def set_leverage(self, login: str, leverage: int) -> bool:
         try:
             resp = await self._get("/UserUpdate", Login=int(login), Leverage=leverage)
+            self._invalidate_account(login)
             logger.info("MT5 leverage set: login=%s leverage=%d", login, leverage)
             return True
         except MT5ManagerAPIError:
@@ -150,6 +155,7 @@ class RealMT5Gateway(MT5Gateway):
         try:
             resp = await self._get("/Deposit",
                 login=int(login), amount=amount, comment=comment, credit=False)
+            self._invalidate_account(login)
             logger.info("MT5 balance deposit: login=%s amount=%.2f ticket=%s", login, amount, resp.text.strip())
             return True
         except MT5ManagerAPIError:
@@ -159,7 +165,6 @@ class RealMT5Gateway(MT5Gateway):
     async def get_trade_history(
         self, login: str, from_timestamp: Optional[float] = None
     ) -> List[MT5Deal]:
-        from datetime import datetime, timezone, timedelta
         try:
             if from_timestamp:
                 dt_from = datetime.fromtimestamp(from_timestamp, tz=timezone.utc)
@@ -199,6 +204,7 @@ class RealMT5Gateway(MT5Gateway):
     async def close_all_positions(self, login: str) -> bool:
         try:
             resp = await self._get("/OrderCloseAll", logins=int(login))
+            self._invalidate_account(login)
             logger.info("MT5 close all positions: login=%s result=%s", login, resp.text.strip())
             return True
         except MT5ManagerAPIError:
@@ -236,7 +242,6 @@ class RealMT5Gateway(MT5Gateway):
     async def get_balance_deals(
         self, login: str, from_timestamp: Optional[float] = None
     ) -> List[MT5BalanceDeal]:
-        from datetime import datetime, timezone, timedelta
         try:
             if from_timestamp:
                 dt_from = datetime.fromtimestamp(from_timestamp, tz=timezone.utc)
@@ -22,7 +22,7 @@ async def lifespan(app: FastAPI):
             logger.exception("Failed to connect MT5 gateway at startup")
     start_scheduler()
     yield
-    stop_scheduler()
+    await stop_scheduler()
     if hasattr(gateway, "disconnect"):
         await gateway.disconnect()
 
@@ -40,6 +40,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the leverage report's paging cursor
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Register routers
@@ -55,15 +57,14 @@ app.include_router(monitoring.router)
 
 @app.get("/api/health")
 async def health():
-    from app.tasks.scheduler import scheduler
+    from app.tasks.scheduler import monitor_running, scheduler
     from app.gateway import gateway
-    monitor_job = scheduler.get_job("account_monitor")
     return {
         "status": "ok",
         "service": "mt5-bonus-plugin",
         "scheduler_running": scheduler.running,
         "gateway_mode": "real" if hasattr(gateway, "connect") else "mock",
-        "monitor_active": monitor_job is not None,
+        "monitor_active": monitor_running(),
     }
 
 
@@ -2,7 +2,7 @@ import enum
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Integer, Float, Enum, DateTime, ForeignKey, Index
+from sqlalchemy import String, Integer, Float, Enum, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin
@@ -48,7 +48,15 @@ class Bonus(TimestampMixin, Base):
 
     __table_args__ = (
         Index("ix_bonuses_mt5_status", "mt5_login", "status"),
+        Index("ix_bonuses_mt5_status_type", "mt5_login", "status", "bonus_type"),
         Index("ix_bonuses_campaign_status", "campaign_id", "status"),
+        Index("ix_bonuses_status_cancelled_at", "status", "cancelled_at"),
+        # Partial: only the rows the expiry checker can still act on
+        Index(
+            "ix_bonuses_active_expires_at", "expires_at",
+            postgresql_where=text("status = 'ACTIVE' AND expires_at IS NOT NULL"),
+            sqlite_where=text("status = 'ACTIVE' AND expires_at IS NOT NULL"),
+        ),
     )
 
 
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import String, Float, Integer, Boolean, DateTime, JSON
+from sqlalchemy import String, Float, Integer, Boolean, DateTime, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -42,3 +42,7 @@ class MonitoredAccount(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+
+    __table_args__ = (
+        Index("ix_monitored_accounts_active_polled", "is_active", "last_polled_at"),
+    )
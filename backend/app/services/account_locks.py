@@ -0,0 +1,17 @@
+import asyncio
+from typing import Dict
+
+# One lock per MT5 login, so work that moves credit on an account (monitor
+# polls, triggers, manual assign/cancel) runs one at a time per account while
+# different accounts proceed in parallel. The event loop is single-threaded,
+# so setdefault needs no guard of its own.
+_login_locks: Dict[str, asyncio.Lock] = {}
+
+
+def login_lock(mt5_login: str) -> asyncio.Lock:
+    """Return the lock serializing credit changes on `mt5_login`.
+
+    Holders should commit before releasing it, so the next holder sees the
+    bonuses that match the credit now on the account.
+    """
+    return _login_locks.setdefault(mt5_login, asyncio.Lock())
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.audit_log import ActorType, AuditLog, EventType
@@ -16,7 +17,15 @@ async def log_event(
     before_state: Optional[dict] = None,
     after_state: Optional[dict] = None,
     metadata: Optional[dict] = None,
+    flush: bool = False,
 ):
+    """Queue an audit entry on the session.
+
+    Entries are written with the session's next flush or commit, so the
+    events of one request or monitor cycle go out as a single batched
+    INSERT in the same transaction as the changes they describe. Pass
+    flush=True when the caller needs the entry's id right away.
+    """
     entry = AuditLog(
         actor_type=actor_type,
         actor_id=actor_id,
@@ -29,5 +38,22 @@ async def log_event(
         metadata_=metadata,
     )
     db.add(entry)
-    await db.flush()
+    if flush:
+        await db.flush()
     return entry
+
+
+async def log_events(db: AsyncSession, entries: List[dict]):
+    """Write several audit entries with one executemany INSERT.
+
+    Each entry takes the same keyword arguments as log_event.
+    """
+    if not entries:
+        return
+    rows = []
+    for entry in entries:
+        row = {"actor_type": ActorType.SYSTEM, **entry}
+        if "metadata" in row:
+            row["metadata_"] = row.pop("metadata")
+        rows.append(row)
+    await db.execute(insert(AuditLog), rows)
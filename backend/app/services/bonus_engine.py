@@ -1,15 +1,19 @@
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Set
 
-from sqlalchemy import select, func
+from sqlalchemy import exists, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.gateway import gateway
+from app.gateway.interface import MT5Account
 from app.models.audit_log import ActorType, EventType
 from app.models.bonus import Bonus, BonusStatus
 from app.models.campaign import Campaign, CampaignStatus
+from app.models.monitored_account import MonitoredAccount
 from app.services.audit_service import log_event
 from app.services.leverage_service import apply_leverage_reduction, restore_leverage
+from app.services.monitor_registry import register_for_monitoring, unregister_if_no_bonuses
 
 
 async def assign_bonus(
@@ -18,8 +22,9 @@ async def assign_bonus(
     mt5_login: str,
     deposit_amount: Optional[float] = None,
     actor_id: Optional[int] = None,
+    monitored: Optional[MonitoredAccount] = None,
 ) -> Bonus:
-    account = await gateway.get_account_info(mt5_login)
+    account = await gateway.get_account_info_cached(mt5_login)
     if not account:
         raise ValueError(f"MT5 account {mt5_login} not found")
 
@@ -45,11 +50,11 @@ async def assign_bonus(
         )
 
     # Calculate expiry
+    now = datetime.now(timezone.utc)
     expires_at = None
     if campaign.expiry_days:
-        expires_at = datetime.now(timezone.utc) + timedelta(days=campaign.expiry_days)
+        expires_at = now + timedelta(days=campaign.expiry_days)
 
-    now = datetime.now(timezone.utc)
     bonus = Bonus(
         campaign_id=campaign.id,
         mt5_login=mt5_login,
@@ -85,8 +90,7 @@ async def assign_bonus(
     )
 
     # Auto-register for monitoring
-    from app.services.monitor_service import register_for_monitoring
-    await register_for_monitoring(db, mt5_login, reason="active_bonus")
+    await register_for_monitoring(db, mt5_login, reason="active_bonus", mon=monitored)
 
     return bonus
 
@@ -137,7 +141,6 @@ async def cancel_bonus(
     )
 
     # Auto-unregister if no active bonuses remain
-    from app.services.monitor_service import unregister_if_no_bonuses
     await unregister_if_no_bonuses(db, bonus.mt5_login)
 
     return bonus
@@ -147,14 +150,53 @@ async def expire_bonus(db: AsyncSession, bonus: Bonus) -> Bonus:
     return await cancel_bonus(db, bonus, reason="expired")
 
 
+@dataclass
+class EligibilityContext:
+    """Account facts shared by every campaign checked for one trigger event.
+
+    Loaded once per event instead of once per campaign; the caller records
+    each bonus it assigns so later campaigns in the same event see it.
+    """
+    account: Optional[MT5Account]
+    active_count: int = 0
+    received_campaign_ids: Set[int] = field(default_factory=set)
+
+    @classmethod
+    async def load(cls, db: AsyncSession, mt5_login: str) -> "EligibilityContext":
+        account = await gateway.get_account_info_cached(mt5_login)
+        if not account:
+            return cls(account=None)  # Eligibility stops at the missing account
+
+        active_count = await db.scalar(
+            select(func.count(Bonus.id)).where(
+                Bonus.mt5_login == mt5_login,
+                Bonus.status == BonusStatus.ACTIVE,
+            )
+        )
+        received = await db.scalars(
+            select(Bonus.campaign_id).where(Bonus.mt5_login == mt5_login).distinct()
+        )
+        return cls(
+            account=account,
+            active_count=active_count or 0,
+            received_campaign_ids=set(received.all()),
+        )
+
+    def record_assignment(self, bonus: Bonus) -> None:
+        self.active_count += 1
+        self.received_campaign_ids.add(bonus.campaign_id)
+
+
 async def check_eligibility(
     db: AsyncSession,
     campaign: Campaign,
     mt5_login: str,
     deposit_amount: Optional[float] = None,
+    *,
+    ctx: Optional[EligibilityContext] = None,
 ) -> tuple[bool, str]:
     """Quick check that returns on the first failure (used by automated triggers)."""
-    failures = await check_eligibility_all(db, campaign, mt5_login, deposit_amount)
+    failures = await check_eligibility_all(db, campaign, mt5_login, deposit_amount, ctx=ctx)
     if failures:
         return False, failures[0]["message"]
     return True, "Eligible"
@@ -165,8 +207,14 @@ async def check_eligibility_all(
     campaign: Campaign,
     mt5_login: str,
     deposit_amount: Optional[float] = None,
+    *,
+    ctx: Optional[EligibilityContext] = None,
 ) -> list[dict]:
-    """Return ALL eligibility failures as a list of {check, message, overridable} dicts."""
+    """Return ALL eligibility failures as a list of {check, message, overridable} dicts.
+
+    With `ctx`, the account snapshot and bonus history come from it rather
+    than from the gateway and database.
+    """
     failures: list[dict] = []
 
     if campaign.status != CampaignStatus.ACTIVE:
@@ -179,7 +227,7 @@ async def check_eligibility_all(
         if datetime.now(timezone.utc) > end:
             failures.append({"check": "campaign_ended", "message": "Campaign has ended", "overridable": False})
 
-    account = await gateway.get_account_info(mt5_login)
+    account = ctx.account if ctx else await gateway.get_account_info_cached(mt5_login)
     if not account:
         failures.append({"check": "account_not_found", "message": "MT5 account not found", "overridable": False})
         return failures  # Can't check further without account
@@ -219,13 +267,16 @@ async def check_eligibility_all(
 
     # One bonus per account
     if campaign.one_bonus_per_account:
-        existing = await db.execute(
-            select(func.count(Bonus.id)).where(
-                Bonus.campaign_id == campaign.id,
-                Bonus.mt5_login == mt5_login,
-            )
-        )
-        if (existing.scalar() or 0) > 0:
+        if ctx:
+            has_previous = campaign.id in ctx.received_campaign_ids
+        else:
+            has_previous = (await db.execute(
+                select(exists().where(
+                    Bonus.campaign_id == campaign.id,
+                    Bonus.mt5_login == mt5_login,
+                ))
+            )).scalar()
+        if has_previous:
             failures.append({
                 "check": "duplicate_bonus",
                 "message": "Account already received this campaign bonus",
@@ -233,10 +284,19 @@ async def check_eligibility_all(
             })
 
     # Max concurrent bonuses
-    active_count_q = select(func.count(Bonus.id)).where(
-        Bonus.mt5_login == mt5_login, Bonus.status == BonusStatus.ACTIVE
-    )
-    active_count = (await db.execute(active_count_q)).scalar() or 0
+    active_filter = (Bonus.mt5_login == mt5_login, Bonus.status == BonusStatus.ACTIVE)
+    if ctx:
+        active_count = ctx.active_count
+    elif campaign.max_concurrent_bonuses == 1 and not (
+        await db.execute(select(exists().where(*active_filter)))
+    ).scalar():
+        # Single-bonus limit: an EXISTS settles the common no-active-bonus case;
+        # the full count is only needed for the failure message
+        active_count = 0
+    else:
+        active_count_q = select(func.count(Bonus.id)).where(*active_filter)
+        active_count = (await db.execute(active_count_q)).scalar() or 0
+
     if active_count >= campaign.max_concurrent_bonuses:
         failures.append({
             "check": "max_concurrent",
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import async_session
+from app.models.campaign import Campaign, CampaignStatus
+
+CAMPAIGN_CACHE_TTL_SECONDS = 60.0
+ACTIVE_CAMPAIGNS_TTL_SECONDS = 30.0
+
+# campaign_id -> (name, bonus_type), shared by the reports so they can skip
+# joining Campaign just for display fields.
+_campaign_cache: Dict[int, Tuple[str, Optional[str]]] = {}
+_expires_at = 0.0
+
+# ACTIVE campaigns for the trigger processors, which otherwise reload them
+# on every deposit/registration event.
+_active_campaigns: List[Campaign] = []
+# The same campaigns grouped by trigger type, and the agent_code-triggered
+# ones by agent code, rebuilt with each reload
+_active_by_trigger: Dict[str, List[Campaign]] = {}
+_active_by_agent_code: Dict[str, List[Campaign]] = {}
+_active_expires_at = 0.0
+_active_lock = asyncio.Lock()
+
+# Bumped on every invalidation so a load that raced with a campaign write
+# doesn't store what it read as fresh.
+_generation = 0
+
+
+def invalidate_campaign_cache() -> None:
+    """Drop cached campaign data; call after committing a campaign change."""
+    global _expires_at, _active_expires_at, _generation
+    _generation += 1
+    _expires_at = 0.0
+    _active_expires_at = 0.0
+
+
+async def get_campaign_labels(
+    db: AsyncSession, campaign_ids: Iterable[int] = (),
+) -> Dict[int, Tuple[str, Optional[str]]]:
+    """Return {campaign_id: (name, bonus_type)} for all campaigns.
+
+    The whole map is reloaded in one query once it expires or when any of
+    `campaign_ids` is missing from it (e.g. a campaign created since).
+    """
+    global _campaign_cache, _expires_at
+    if time.monotonic() >= _expires_at or any(cid not in _campaign_cache for cid in campaign_ids):
+        generation = _generation
+        result = await db.execute(select(Campaign.id, Campaign.name, Campaign.bonus_type))
+        _campaign_cache = {
+            cid: (name, bonus_type.value if bonus_type else None)
+            for cid, name, bonus_type in result
+        }
+        if generation == _generation:
+            _expires_at = time.monotonic() + CAMPAIGN_CACHE_TTL_SECONDS
+    return _campaign_cache
+
+
+async def get_active_campaigns() -> List[Campaign]:
+    """Return the ACTIVE campaigns, reloaded at most every ACTIVE_CAMPAIGNS_TTL_SECONDS.
+
+    They are loaded in a session of their own, so the returned objects are
+    detached and safe to read from any session. Callers must not modify them.
+    """
+    global _active_campaigns, _active_by_trigger, _active_by_agent_code, _active_expires_at
+    if time.monotonic() < _active_expires_at:
+        return _active_campaigns
+
+    async with _active_lock:
+        # Another task may have reloaded while this one waited
+        if time.monotonic() < _active_expires_at:
+            return _active_campaigns
+        generation = _generation
+        async with async_session() as session:
+            result = await session.execute(
+                select(Campaign).where(Campaign.status == CampaignStatus.ACTIVE)
+            )
+            campaigns = list(result.scalars().all())
+        by_trigger: Dict[str, List[Campaign]] = {}
+        by_agent_code: Dict[str, List[Campaign]] = {}
+        for campaign in campaigns:
+            for trigger_type in campaign.trigger_types or []:
+                by_trigger.setdefault(trigger_type, []).append(campaign)
+        for campaign in by_trigger.get("agent_code", []):
+            for agent_code in set(campaign.agent_codes or []):
+                by_agent_code.setdefault(agent_code, []).append(campaign)
+        _active_campaigns = campaigns
+        _active_by_trigger = by_trigger
+        _active_by_agent_code = by_agent_code
+        if generation == _generation:
+            _active_expires_at = time.monotonic() + ACTIVE_CAMPAIGNS_TTL_SECONDS
+        return campaigns
+
+
+async def get_active_campaigns_for_trigger(trigger_type: str) -> List[Campaign]:
+    """Return the cached ACTIVE campaigns that list `trigger_type`."""
+    await get_active_campaigns()
+    return _active_by_trigger.get(trigger_type, [])
+
+
+async def get_active_campaigns_for_agent_code(agent_code: str) -> List[Campaign]:
+    """Return the cached ACTIVE agent_code-triggered campaigns listing `agent_code`."""
+    await get_active_campaigns()
+    return _active_by_agent_code.get(agent_code, [])
@@ -0,0 +1,29 @@
+from typing import List, Sequence
+
+from app.gateway.interface import MT5Deal
+from app.models.bonus import Bonus
+from app.models.campaign import Campaign, LotTrackingScope
+
+
+def filter_deals(campaign: Campaign, bonus: Bonus, deals: Sequence[MT5Deal]) -> List[MT5Deal]:
+    """Return the deals that count toward a Type C bonus's lot requirement."""
+    return [d for d in deals if is_deal_eligible(campaign, bonus, d)]
+
+
+def is_deal_eligible(campaign: Campaign, bonus: Bonus, deal: MT5Deal) -> bool:
+    """Whether a deal falls within the campaign's lot tracking scope."""
+    scope = campaign.lot_tracking_scope
+
+    if scope == LotTrackingScope.SYMBOL_FILTERED:
+        if campaign.symbol_filter and deal.symbol not in campaign.symbol_filter:
+            return False
+
+    if scope == LotTrackingScope.PER_TRADE_THRESHOLD:
+        if campaign.per_trade_lot_minimum and deal.volume_lots < campaign.per_trade_lot_minimum:
+            return False
+
+    if scope == LotTrackingScope.POST_BONUS:
+        if deal.timestamp < bonus.assigned_at.timestamp():
+            return False
+
+    return True
@@ -1,11 +1,17 @@
-import math
-
 from app.gateway.interface import MT5Gateway
 
 
 def calculate_adjusted_leverage(original_leverage: int, bonus_percentage: float) -> int:
-    multiplier = (bonus_percentage / 100.0) + 1.0
-    return math.floor(original_leverage / multiplier)
+    return calculate_adjusted_leverage_bps(original_leverage, round(bonus_percentage * 100))
+
+
+def calculate_adjusted_leverage_bps(original_leverage: int, bonus_bps: int) -> int:
+    """floor(original / (1 + bps/10000)) in pure integers.
+
+    The float form misrounds exact quotients, e.g. 28 / 1.12 == 24.999...
+    which floors to 24 instead of 25.
+    """
+    return (original_leverage * 10000) // (10000 + bonus_bps)
 
 
 async def apply_leverage_reduction(
@@ -1,56 +1,83 @@
 from datetime import datetime, timezone
+from typing import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.gateway.interface import MT5Deal
 from app.gateway import gateway
 from app.models.audit_log import EventType
 from app.models.bonus import Bonus, BonusLotProgress, BonusStatus
-from app.models.campaign import Campaign, LotTrackingScope
-from app.services.audit_service import log_event
-
-
-async def process_deal(db: AsyncSession, bonus: Bonus, deal: MT5Deal) -> bool:
-    if bonus.status != BonusStatus.ACTIVE or bonus.bonus_type != "C":
-        return False
-
-    campaign = await db.get(Campaign, bonus.campaign_id)
-    if not campaign:
-        return False
-
-    # Check lot tracking scope
-    if not _is_deal_eligible(campaign, bonus, deal):
-        return False
-
-    # Calculate conversion amount
+from app.models.campaign import Campaign
+from app.services.audit_service import log_event, log_events
+from app.services.deal_filter import filter_deals
+
+
+async def process_deals(db: AsyncSession, bonuses: Sequence[Bonus], deals: Sequence[MT5Deal]) -> int:
+    """Apply a login's deals, in order, to its Type C bonuses.
+
+    Each deal's conversions across all the bonuses are summed into one
+    credit-to-balance move on MT5, and its progress rows and audit entries
+    are written with one INSERT each. Every deal is recorded and flushed
+    before the next one moves any money. Returns the number of conversion
+    steps.
+    """
+    tracked = []
+    for bonus in bonuses:
+        if bonus.status != BonusStatus.ACTIVE or bonus.bonus_type != "C":
+            continue
+        campaign = await db.get(Campaign, bonus.campaign_id)
+        if campaign:
+            eligible_ids = {deal.deal_id for deal in filter_deals(campaign, bonus, deals)}
+            tracked.append((bonus, eligible_ids))
+    if not tracked:
+        return 0
+
+    steps = 0
+    for deal in deals:
+        conversions = []
+        for bonus, eligible_ids in tracked:
+            # Bonuses fully converted by an earlier deal are ACTIVE no more
+            if bonus.status != BonusStatus.ACTIVE or deal.deal_id not in eligible_ids:
+                continue
+            convert_amount = _conversion_amount(bonus, deal)
+            if convert_amount > 0:
+                conversions.append((bonus, convert_amount))
+        if not conversions:
+            continue
+
+        # Execute conversion: remove credit, add to balance
+        total = sum(amount for _, amount in conversions)
+        await gateway.remove_credit(deal.login, total, f"Convert lot {deal.deal_id}")
+        await gateway.deposit_to_balance(deal.login, total, f"Convert lot {deal.deal_id}")
+
+        # Record progress
+        progress_rows = []
+        audit_entries = []
+        for bonus, convert_amount in conversions:
+            progress_rows.append(_progress_row(bonus, deal, convert_amount))
+            _apply_conversion(bonus, deal, convert_amount)
+            audit_entries.append(_conversion_audit_entry(bonus, deal, convert_amount))
+        await db.execute(insert(BonusLotProgress), progress_rows)
+        await db.flush()
+        await log_events(db, audit_entries)
+        steps += len(progress_rows)
+    return steps
+
+
+def _conversion_amount(bonus: Bonus, deal: MT5Deal) -> float:
+    """Credit a deal converts for this bonus, capped at what's left unconverted."""
     if not bonus.lots_required or bonus.lots_required <= 0:
-        return False
+        return 0.0
 
     conversion_per_lot = bonus.bonus_amount / bonus.lots_required
     convert_amount = deal.volume_lots * conversion_per_lot
 
     remaining_credit = bonus.bonus_amount - bonus.amount_converted
-    if convert_amount > remaining_credit:
-        convert_amount = remaining_credit
-
-    if convert_amount <= 0:
-        return False
-
-    # Execute conversion: remove credit, add to balance
-    await gateway.remove_credit(bonus.mt5_login, convert_amount, f"Convert lot {deal.deal_id}")
-    await gateway.deposit_to_balance(bonus.mt5_login, convert_amount, f"Convert lot {deal.deal_id}")
+    return min(convert_amount, remaining_credit)
 
-    # Record progress
-    progress = BonusLotProgress(
-        bonus_id=bonus.id,
-        deal_id=deal.deal_id,
-        symbol=deal.symbol,
-        lots=deal.volume_lots,
-        amount_converted=convert_amount,
-    )
-    db.add(progress)
 
+def _apply_conversion(bonus: Bonus, deal: MT5Deal, convert_amount: float) -> None:
     bonus.lots_traded += deal.volume_lots
     bonus.amount_converted += convert_amount
 
@@ -59,15 +86,25 @@ async def process_deal(db: AsyncSession, bonus: Bonus, deal: MT5Deal) -> bool:
         bonus.status = BonusStatus.CONVERTED
         bonus.amount_converted = bonus.bonus_amount
 
-    await db.flush()
 
-    await log_event(
-        db,
-        event_type=EventType.CONVERSION_STEP,
-        mt5_login=bonus.mt5_login,
-        campaign_id=bonus.campaign_id,
-        bonus_id=bonus.id,
-        after_state={
+def _progress_row(bonus: Bonus, deal: MT5Deal, convert_amount: float) -> dict:
+    return {
+        "bonus_id": bonus.id,
+        "deal_id": deal.deal_id,
+        "symbol": deal.symbol,
+        "lots": deal.volume_lots,
+        "amount_converted": convert_amount,
+    }
+
+
+def _conversion_audit_entry(bonus: Bonus, deal: MT5Deal, convert_amount: float) -> dict:
+    """log_event arguments for a conversion step; call after _apply_conversion."""
+    return {
+        "event_type": EventType.CONVERSION_STEP,
+        "mt5_login": bonus.mt5_login,
+        "campaign_id": bonus.campaign_id,
+        "bonus_id": bonus.id,
+        "after_state": {
             "deal_id": deal.deal_id,
             "lots": deal.volume_lots,
             "amount_converted": convert_amount,
@@ -75,8 +112,7 @@ async def process_deal(db: AsyncSession, bonus: Bonus, deal: MT5Deal) -> bool:
             "total_lots": bonus.lots_traded,
             "fully_converted": bonus.status == BonusStatus.CONVERTED,
         },
-    )
-    return True
+    }
 
 
 async def handle_withdrawal(db: AsyncSession, bonus: Bonus, withdrawal_amount: float) -> bool:
@@ -118,20 +154,3 @@ async def handle_withdrawal(db: AsyncSession, bonus: Bonus, withdrawal_amount: f
     )
     return True
 
-
-def _is_deal_eligible(campaign: Campaign, bonus: Bonus, deal: MT5Deal) -> bool:
-    scope = campaign.lot_tracking_scope
-
-    if scope == LotTrackingScope.SYMBOL_FILTERED:
-        if campaign.symbol_filter and deal.symbol not in campaign.symbol_filter:
-            return False
-
-    if scope == LotTrackingScope.PER_TRADE_THRESHOLD:
-        if campaign.per_trade_lot_minimum and deal.volume_lots < campaign.per_trade_lot_minimum:
-            return False
-
-    if scope == LotTrackingScope.POST_BONUS:
-        if deal.timestamp < bonus.assigned_at.timestamp():
-            return False
-
-    return True
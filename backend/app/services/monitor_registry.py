@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.gateway import gateway
+from app.models.bonus import Bonus, BonusStatus
+from app.models.monitored_account import MonitoredAccount
+
+# mt5_login -> MonitoredAccount.id, so repeat lookups become primary-key gets
+# that the session identity map can answer without a query.
+_monitored_ids: Dict[str, int] = {}
+
+
+def remember_monitored_ids(pairs: Iterable[Tuple[str, int]]):
+    """Cache (mt5_login, MonitoredAccount.id) pairs read elsewhere, e.g. by discovery."""
+    _monitored_ids.update(pairs)
+
+
+async def get_monitored_account(db: AsyncSession, mt5_login: str) -> Optional[MonitoredAccount]:
+    """Fetch the monitoring row for a login, preferring the cached primary key."""
+    mon_id = _monitored_ids.get(mt5_login)
+    if mon_id is not None:
+        mon = await db.get(MonitoredAccount, mon_id)
+        if mon is not None and mon.mt5_login == mt5_login:
+            return mon
+        _monitored_ids.pop(mt5_login, None)
+
+    result = await db.execute(
+        select(MonitoredAccount).where(MonitoredAccount.mt5_login == mt5_login)
+    )
+    mon = result.scalar_one_or_none()
+    if mon is not None:
+        _monitored_ids[mt5_login] = mon.id
+    return mon
+
+
+async def register_for_monitoring(
+    db: AsyncSession,
+    mt5_login: str,
+    reason: str = "active_bonus",
+    mon: Optional[MonitoredAccount] = None,
+) -> MonitoredAccount:
+    """Add or update an account in the monitoring table.
+
+    Callers that already hold the account's monitoring row (e.g. the monitor
+    poll that detected the deposit) pass it as `mon` to skip the lookup.
+    """
+    if mon is None:
+        mon = await get_monitored_account(db, mt5_login)
+
+    if mon is None:
+        # Fetch current snapshot from MT5
+        account = await gateway.get_account_info(mt5_login)
+        mon = MonitoredAccount(
+            mt5_login=mt5_login,
+            last_balance=account.balance if account else 0.0,
+            last_equity=account.equity if account else 0.0,
+            last_credit=account.credit if account else 0.0,
+            last_deal_timestamp=0.0,  # Start from beginning to catch all deals
+            is_active=True,
+            monitor_reasons=[reason],
+            last_polled_at=datetime.now(timezone.utc),
+        )
+        db.add(mon)
+    else:
+        # Refresh snapshot from MT5 to avoid stale data
+        account = await gateway.get_account_info(mt5_login)
+        if account:
+            mon.last_balance = account.balance
+            mon.last_equity = account.equity
+            mon.last_credit = account.credit
+        # Only touch monitor_reasons when the reason is new, so re-registering
+        # doesn't rewrite the JSON column
+        reasons = mon.monitor_reasons or []
+        if reason not in reasons:
+            mon.monitor_reasons = reasons + [reason]
+        mon.is_active = True
+        mon.consecutive_errors = 0
+
+    if mon.id is None:
+        await db.flush()
+    _monitored_ids[mt5_login] = mon.id
+    return mon
+
+
+async def unregister_if_no_bonuses(db: AsyncSession, mt5_login: str):
+    """Deactivate monitoring if account has no active bonuses."""
+    # EXISTS stops at the first matching (mt5_login, status) index entry
+    has_active = await db.scalar(
+        select(exists().where(
+            Bonus.mt5_login == mt5_login,
+            Bonus.status == BonusStatus.ACTIVE,
+        ))
+    )
+    if has_active:
+        return  # Still has active bonuses
+
+    mon = await get_monitored_account(db, mt5_login)
+    if mon:
+        # Keep monitoring if registered for deposit watching or auto-discovered
+        keep_reasons = {"deposit_watch", "auto_discovered"}
+        reasons = mon.monitor_reasons or []
+        remaining = [r for r in reasons if r in keep_reasons]
+        if remaining == reasons and (remaining or not mon.is_active):
+            return  # Nothing to drop
+        if not remaining:
+            mon.is_active = False
+        mon.monitor_reasons = remaining
+        await db.flush()
@@ -1,103 +1,76 @@
+import asyncio
 import logging
+import time
+from collections import defaultdict
 from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from app.config.settings import settings
+from app.db.database import async_session
 from app.gateway import gateway
+from app.gateway.interface import MT5Account
+from app.models.audit_log import ActorType, EventType
 from app.models.bonus import Bonus, BonusStatus
 from app.models.monitored_account import MonitoredAccount
-from app.services.bonus_engine import cancel_bonus
+from app.services.account_locks import login_lock
+from app.services.audit_service import log_event, log_events
+from app.services.leverage_service import calculate_adjusted_leverage, restore_leverage
+from app.services.lot_tracker import process_deals
+from app.services.monitor_registry import remember_monitored_ids, unregister_if_no_bonuses
 from app.services.trigger_service import process_deposit_trigger
-from app.tasks.event_processor import process_deal_event
 
 logger = logging.getLogger(__name__)
 
 MAX_CONSECUTIVE_ERRORS = 5
+DISCOVERY_BATCH_SIZE = 500
+MONITOR_BATCH_SIZE = 500
 
+# Monotonic time of the last cycle that polled every account
+_last_full_sweep = 0.0
 
-async def register_for_monitoring(
-    db: AsyncSession, mt5_login: str, reason: str = "active_bonus"
-) -> MonitoredAccount:
-    """Add or update an account in the monitoring table."""
-    result = await db.execute(
-        select(MonitoredAccount).where(MonitoredAccount.mt5_login == mt5_login)
-    )
-    mon = result.scalar_one_or_none()
-
-    if mon is None:
-        # Fetch current snapshot from MT5
-        account = await gateway.get_account_info(mt5_login)
-        mon = MonitoredAccount(
-            mt5_login=mt5_login,
-            last_balance=account.balance if account else 0.0,
-            last_equity=account.equity if account else 0.0,
-            last_credit=account.credit if account else 0.0,
-            last_deal_timestamp=0.0,  # Start from beginning to catch all deals
-            is_active=True,
-            monitor_reasons=[reason],
-            last_polled_at=datetime.now(timezone.utc),
-        )
-        db.add(mon)
-    else:
-        # Refresh snapshot from MT5 to avoid stale data
-        account = await gateway.get_account_info(mt5_login)
-        if account:
-            mon.last_balance = account.balance
-            mon.last_equity = account.equity
-            mon.last_credit = account.credit
-        reasons = mon.monitor_reasons or []
-        if reason not in reasons:
-            mon.monitor_reasons = reasons + [reason]
-        mon.is_active = True
-        mon.consecutive_errors = 0
-
-    await db.flush()
-    return mon
-
-
-async def unregister_if_no_bonuses(db: AsyncSession, mt5_login: str):
-    """Deactivate monitoring if account has no active bonuses."""
-    active_q = await db.execute(
-        select(Bonus.id).where(
-            Bonus.mt5_login == mt5_login,
-            Bonus.status == BonusStatus.ACTIVE,
-        )
-    )
-    if active_q.first() is not None:
-        return  # Still has active bonuses
-
-    result = await db.execute(
-        select(MonitoredAccount).where(MonitoredAccount.mt5_login == mt5_login)
-    )
-    mon = result.scalar_one_or_none()
-    if mon:
-        # Keep monitoring if registered for deposit watching or auto-discovered
-        keep_reasons = {"deposit_watch", "auto_discovered"}
-        remaining = [r for r in (mon.monitor_reasons or []) if r in keep_reasons]
-        if not remaining:
-            mon.is_active = False
-            mon.monitor_reasons = []
-        else:
-            mon.monitor_reasons = remaining
-        await db.flush()
 
-
-async def poll_single_account(db: AsyncSession, mon: MonitoredAccount) -> dict:
+async def poll_single_account(
+    db: AsyncSession,
+    mon: MonitoredAccount,
+    account: Optional[MT5Account] = None,
+    active_types: Optional[Set[str]] = None,
+) -> dict:
     """
     Poll one monitored account. Returns summary of actions taken.
     Order: deposits -> withdrawal/drawdown -> Type C trades -> update snapshot.
+
+    `account` is a snapshot the caller read while holding the login lock; the
+    account is only re-read from MT5 after this poll changes it. `active_types`
+    holds the types of the account's active bonuses, read under the same lock;
+    it only lets the poll skip bonus lookups, and is dropped once the poll
+    changes bonuses.
     """
     actions = {"login": mon.mt5_login, "deposits": 0, "withdrawals": 0,
                "drawdowns": 0, "deals": 0}
 
     try:
-        account = await gateway.get_account_info(mon.mt5_login)
+        if account is None:
+            account = await gateway.get_account_info(mon.mt5_login)
         if account is None:
             mon.consecutive_errors += 1
             mon.last_error = "Account not found in MT5"
             return actions
 
+        # === IDLE SHORT-CIRCUIT ===
+        # Snapshot unchanged and no credit on the account (or only credit
+        # backed by Type A/B bonuses): no deposit, withdrawal, drawdown,
+        # orphaned credit or Type C conversion can be pending, so skip the
+        # deal-history and bonus lookups entirely.
+        if _is_idle(mon, account, active_types):
+            _mark_polled(mon, datetime.now(timezone.utc))
+            return actions
+
         # === DEPOSIT DETECTION ===
         # Balance increased and credit didn't increase (no bonus was just assigned)
         balance_delta = account.balance - mon.last_balance
@@ -121,7 +94,9 @@ async def poll_single_account(db: AsyncSession, mon: MonitoredAccount) -> dict:
                         "Auto-deposit detected: login=%s amount=%.2f deal=%s lead_source=%s",
                         mon.mt5_login, deal.amount, deal.deal_id, agent_code,
                     )
-                    await process_deposit_trigger(db, mon.mt5_login, deal.amount, agent_code)
+                    await process_deposit_trigger(
+                        db, mon.mt5_login, deal.amount, agent_code, monitored=mon,
+                    )
                     actions["deposits"] += 1
                     if deal.timestamp > mon.last_deal_timestamp:
                         mon.last_deal_timestamp = deal.timestamp
@@ -131,10 +106,13 @@ async def poll_single_account(db: AsyncSession, mon: MonitoredAccount) -> dict:
                     "Auto-deposit detected (via snapshot): login=%s amount=%.2f lead_source=%s",
                     mon.mt5_login, balance_delta, agent_code,
                 )
-                await process_deposit_trigger(db, mon.mt5_login, balance_delta, agent_code)
+                await process_deposit_trigger(
+                    db, mon.mt5_login, balance_delta, agent_code, monitored=mon,
+                )
                 actions["deposits"] += 1
 
             # Re-fetch account after trigger may have posted credit
+            active_types = None
             account = await gateway.get_account_info(mon.mt5_login)
             if account is None:
                 mon.consecutive_errors += 1
@@ -161,6 +139,7 @@ async def poll_single_account(db: AsyncSession, mon: MonitoredAccount) -> dict:
                     db, mon.mt5_login, withdrawal_ratio, withdrawal_amount,
                 )
             actions["withdrawals"] += 1
+            active_types = None
             # Re-fetch after credit adjustment
             account = await gateway.get_account_info(mon.mt5_login)
             if account is None:
@@ -189,6 +168,7 @@ async def poll_single_account(db: AsyncSession, mon: MonitoredAccount) -> dict:
                 db, mon.mt5_login, reason=reason,
             )
             actions["drawdowns"] += 1
+            active_types = None
             # Re-fetch after credit removal
             account = await gateway.get_account_info(mon.mt5_login)
             if account is None:
@@ -208,7 +188,8 @@ async def poll_single_account(db: AsyncSession, mon: MonitoredAccount) -> dict:
                     "(likely pending bonus assignment)",
                     mon.mt5_login, account.credit, mon.last_credit,
                 )
-            else:
+            elif not active_types:
+                # Confirm against the database before removing any credit
                 active_bonuses = await _get_active_bonuses(db, mon.mt5_login)
                 if not active_bonuses:
                     logger.info(
@@ -222,13 +203,28 @@ async def poll_single_account(db: AsyncSession, mon: MonitoredAccount) -> dict:
                         return actions
 
         # === TYPE C TRADE TRACKING ===
-        type_c_bonuses = await _get_active_type_c_bonuses(db, mon.mt5_login)
+        type_c_bonuses, trades = [], []
+        if active_types is None:
+            type_c_bonuses = await _get_active_type_c_bonuses(db, mon.mt5_login)
+            if type_c_bonuses:
+                trades = await gateway.get_trade_history(
+                    mon.mt5_login, from_timestamp=mon.last_deal_timestamp
+                )
+        elif "C" in active_types:
+            # Known Type C account: the bonus lookup (DB) and the trade fetch
+            # (MT5) don't depend on each other, so overlap them
+            async with asyncio.TaskGroup() as tg:
+                bonuses_task = tg.create_task(_get_active_type_c_bonuses(db, mon.mt5_login))
+                trades_task = tg.create_task(gateway.get_trade_history(
+                    mon.mt5_login, from_timestamp=mon.last_deal_timestamp
+                ))
+            type_c_bonuses, trades = bonuses_task.result(), trades_task.result()
         if type_c_bonuses:
-            trades = await gateway.get_trade_history(
-                mon.mt5_login, from_timestamp=mon.last_deal_timestamp
-            )
+            # One deal at a time: the watermark only passes a deal once its
+            # conversion is recorded, so a failure part way through can't
+            # have the next poll convert the earlier deals again
             for deal in trades:
-                await process_deal_event(db, deal)
+                await process_deals(db, type_c_bonuses, [deal])
                 actions["deals"] += 1
                 if deal.timestamp > mon.last_deal_timestamp:
                     mon.last_deal_timestamp = deal.timestamp
@@ -242,110 +238,313 @@ async def poll_single_account(db: AsyncSession, mon: MonitoredAccount) -> dict:
         mon.last_equity = account.equity
         mon.last_credit = account.credit
 
-        mon.last_polled_at = datetime.now(timezone.utc)
-        mon.consecutive_errors = 0
-        mon.last_error = None
+        _mark_polled(mon, datetime.now(timezone.utc))
 
     except Exception as e:
         mon.consecutive_errors += 1
         mon.last_error = str(e)[:500]
         logger.exception("Monitor poll failed: login=%s", mon.mt5_login)
 
-    await db.flush()
     return actions
 
 
 async def run_monitor_cycle(db: AsyncSession) -> dict:
-    """Main entry point called by the scheduler. Polls all active monitored accounts."""
-    # Auto-discover new MT5 accounts and register them
+    """Main entry point called by the scheduler. Polls active monitored accounts.
+
+    Gateways that report their own account changes only get the changed
+    accounts polled, with a full sweep every MONITOR_FULL_SWEEP_SECONDS as a
+    safety net; otherwise every cycle is a full sweep.
+    """
+    full_sweep = (
+        not gateway.pushes_changes
+        or time.monotonic() - _last_full_sweep >= settings.MONITOR_FULL_SWEEP_SECONDS
+    )
+    changed = gateway.drain_changed_logins()
     try:
-        all_logins = await gateway.get_all_logins()
-        if all_logins:
-            existing = await db.execute(select(MonitoredAccount))
-            existing_map = {m.mt5_login: m for m in existing.scalars().all()}
-            for login in all_logins:
-                login_str = str(login)
-                if login_str not in existing_map:
-                    await register_for_monitoring(db, login_str, reason="auto_discovered")
-                    logger.info("Auto-discovered new MT5 account: %s", login_str)
-                elif not existing_map[login_str].is_active:
-                    # Reactivate inactive accounts found on MT5
-                    mon = existing_map[login_str]
-                    mon.is_active = True
-                    if "auto_discovered" not in (mon.monitor_reasons or []):
-                        mon.monitor_reasons = (mon.monitor_reasons or []) + ["auto_discovered"]
-                    logger.info("Reactivated MT5 account: %s", login_str)
-            await db.flush()
+        return await _poll_monitored_accounts(db, full_sweep, changed)
     except Exception:
-        logger.exception("Account auto-discovery failed")
+        # Hand the drained logins back, so they're retried next cycle instead
+        # of waiting up to MONITOR_FULL_SWEEP_SECONDS for a full sweep
+        gateway.requeue_changed_logins(changed)
+        raise
 
-    result = await db.execute(
-        select(MonitoredAccount).where(
-            MonitoredAccount.is_active == True,  # noqa: E712
-            MonitoredAccount.consecutive_errors < MAX_CONSECUTIVE_ERRORS,
-        ).order_by(MonitoredAccount.last_polled_at.asc().nullsfirst())
-    )
-    accounts = result.scalars().all()
+
+async def _poll_monitored_accounts(db: AsyncSession, full_sweep: bool, changed: Set[str]) -> dict:
+    global _last_full_sweep
 
     summary = {
-        "total": len(accounts), "deposits": 0, "withdrawals": 0,
+        "total": 0, "deposits": 0, "withdrawals": 0,
         "drawdowns": 0, "deals": 0, "errors": 0,
     }
 
-    for mon in accounts:
-        poll_result = await poll_single_account(db, mon)
-        summary["deposits"] += poll_result["deposits"]
-        summary["withdrawals"] += poll_result["withdrawals"]
-        summary["drawdowns"] += poll_result["drawdowns"]
-        summary["deals"] += poll_result["deals"]
-        if mon.consecutive_errors > 0:
-            summary["errors"] += 1
+    if full_sweep:
+        _last_full_sweep = time.monotonic()
+        # Auto-discover new MT5 accounts and register them
+        try:
+            await _discover_accounts(db)
+        except Exception:
+            logger.exception("Account auto-discovery failed")
+    elif not changed:
+        return summary
+
+    concurrency = _poll_concurrency(db)
+    # Polls commit as they go, in their own sessions or (on SQLite) in this
+    # one; commit discovery first so they see the rows it wrote and no write
+    # lock is held while waiting for a login lock.
+    await db.commit()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    query = select(MonitoredAccount).where(
+        MonitoredAccount.is_active == True,  # noqa: E712
+        MonitoredAccount.consecutive_errors < MAX_CONSECUTIVE_ERRORS,
+    )
+    if not full_sweep:
+        query = query.where(MonitoredAccount.mt5_login.in_(changed))
+
+    query = query.order_by(MonitoredAccount.last_polled_at.asc().nullsfirst())
+    if concurrency > 1:
+        # Stream the active accounts in chunks rather than materializing them
+        # all; polled rows are clean after each flush and drop out of the
+        # identity map.
+        result = await db.stream_scalars(query.execution_options(yield_per=MONITOR_BATCH_SIZE))
+        partitions = result.partitions()
+    else:
+        # The sequential path commits after every poll, which would close a
+        # streamed result
+        partitions = _in_chunks((await db.scalars(query)).all(), MONITOR_BATCH_SIZE)
+
+    async for accounts in partitions:
+        summary["total"] += len(accounts)
+        try:
+            snapshots = await gateway.get_account_info_batch([mon.mt5_login for mon in accounts])
+        except Exception:
+            # Fall back to per-account reads inside each poll
+            logger.exception("Batched account fetch failed")
+            snapshots = {}
+
+        active_types = await _load_active_bonus_types(db, [mon.mt5_login for mon in accounts])
+
+        # Settle idle accounts in one pass here; only the rest need a lock,
+        # a session and the full poll.
+        polled_at = datetime.now(timezone.utc)
+        busy = []
+        for mon in accounts:
+            account = snapshots.get(mon.mt5_login)
+            if account is not None and _is_idle(mon, account, active_types[mon.mt5_login]):
+                _mark_polled(mon, polled_at)
+            else:
+                busy.append(mon)
+        if not busy:
+            await _write_partition(db, concurrency)
+            continue
+        accounts = busy
+
+        # The batch reads above only sort idle accounts from busy ones. They
+        # were taken before any login lock, so a busy account is read again
+        # under its lock: an API deposit, assignment or cancellation may have
+        # changed it in between.
+        if concurrency > 1:
+            poll_results = await asyncio.gather(
+                *(_poll_in_own_session(mon, semaphore) for mon in accounts)
+            )
+        else:
+            poll_results = []
+            for mon in accounts:
+                async with login_lock(mon.mt5_login):
+                    account, types = await _read_locked_account(db, mon.mt5_login)
+                    poll_results.append(await poll_single_account(db, mon, account, types))
+                    # Commit before the lock is released and the next one is
+                    # taken. Holding SQLite's write lock while waiting for
+                    # another login's lock would deadlock against an API
+                    # request that holds that lock and needs to write.
+                    await db.commit()
+        await _write_partition(db, concurrency)
+
+        for mon, poll_result in zip(accounts, poll_results):
+            summary["deposits"] += poll_result["deposits"]
+            summary["withdrawals"] += poll_result["withdrawals"]
+            summary["drawdowns"] += poll_result["drawdowns"]
+            summary["deals"] += poll_result["deals"]
+            if mon.consecutive_errors > 0:
+                summary["errors"] += 1
 
     return summary
 
 
+async def _in_chunks(items: List[MonitoredAccount], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def _write_partition(db: AsyncSession, concurrency: int):
+    if concurrency > 1:
+        # Write the partition's snapshot updates together (the unit of work
+        # sends one executemany UPDATE per set of changed columns) rather
+        # than flushing after every poll.
+        await db.flush()
+    else:
+        # Commit, so the cycle never holds SQLite's write lock while it waits
+        # for the next partition's login locks
+        await db.commit()
+
+
+def _poll_concurrency(db: AsyncSession) -> int:
+    # SQLite has a single writer lock, so parallel sessions would only contend for it
+    if db.bind.dialect.name == "sqlite":
+        return 1
+    return max(1, settings.MONITOR_POLL_CONCURRENCY)
+
+
+async def _poll_in_own_session(mon: MonitoredAccount, semaphore: asyncio.Semaphore) -> dict:
+    """Poll one account in a dedicated session so polls can overlap their I/O.
+
+    `mon` stays attached to the cycle's session, which persists its snapshot
+    fields; bonus changes made by the poll are committed here.
+    """
+    async with semaphore, login_lock(mon.mt5_login):
+        async with async_session() as session:
+            errors_before = mon.consecutive_errors
+            try:
+                account, active_types = await _read_locked_account(session, mon.mt5_login)
+                actions = await poll_single_account(session, mon, account, active_types)
+                await session.commit()
+                return actions
+            except Exception as e:
+                await session.rollback()
+                # A failed poll was already counted (and its cause recorded)
+                # by poll_single_account; only count the commit failure itself
+                if mon.consecutive_errors == errors_before:
+                    mon.consecutive_errors += 1
+                    mon.last_error = str(e)[:500]
+                logger.exception("Monitor poll commit failed: login=%s", mon.mt5_login)
+                return {"login": mon.mt5_login, "deposits": 0, "withdrawals": 0,
+                        "drawdowns": 0, "deals": 0}
+
+
+async def _read_locked_account(
+    db: AsyncSession, mt5_login: str,
+) -> Tuple[Optional[MT5Account], Set[str]]:
+    """Current snapshot and active bonus types of an account whose login lock is held."""
+    account = await gateway.get_account_info(mt5_login)
+    active_types = await _load_active_bonus_types(db, [mt5_login])
+    return account, active_types[mt5_login]
+
+
+async def _discover_accounts(db: AsyncSession):
+    """Register MT5 logins not yet monitored and reactivate inactive ones, in bulk."""
+    all_logins = {str(login) for login in await gateway.get_all_logins()}
+    if not all_logins:
+        return
+
+    existing = (await db.execute(
+        select(
+            MonitoredAccount.id,
+            MonitoredAccount.mt5_login,
+            MonitoredAccount.is_active,
+            MonitoredAccount.monitor_reasons,
+        )
+    )).all()
+    remember_monitored_ids((row.mt5_login, row.id) for row in existing)
+
+    new_logins = sorted(all_logins - {row.mt5_login for row in existing})
+    dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    for i in range(0, len(new_logins), DISCOVERY_BATCH_SIZE):
+        batch = new_logins[i:i + DISCOVERY_BATCH_SIZE]
+        snapshots = await gateway.get_account_info_batch(batch)
+        now = datetime.now(timezone.utc)
+        rows = []
+        for login in batch:
+            account = snapshots.get(login)
+            rows.append({
+                "mt5_login": login,
+                "last_balance": account.balance if account else 0.0,
+                "last_equity": account.equity if account else 0.0,
+                "last_credit": account.credit if account else 0.0,
+                "last_deal_timestamp": 0.0,  # Start from beginning to catch all deals
+                "is_active": True,
+                "monitor_reasons": ["auto_discovered"],
+                "consecutive_errors": 0,
+                "last_polled_at": now,
+            })
+        # Passing the rows as parameters (executemany) lets SQLAlchemy pack them
+        # into as few INSERT statements as the driver's parameter limit allows.
+        # A login registered concurrently (e.g. by a bonus assignment) is left as is.
+        await db.execute(
+            dialect_insert(MonitoredAccount).on_conflict_do_nothing(
+                index_elements=["mt5_login"]
+            ),
+            rows,
+        )
+    if new_logins:
+        logger.info("Auto-discovered %d new MT5 account(s)", len(new_logins))
+
+    # Reactivate inactive accounts found on MT5
+    reactivate = []
+    for row in existing:
+        if row.mt5_login in all_logins and not row.is_active:
+            reasons = row.monitor_reasons or []
+            if "auto_discovered" not in reasons:
+                reasons = reasons + ["auto_discovered"]
+            reactivate.append({"id": row.id, "is_active": True, "monitor_reasons": reasons})
+    if reactivate:
+        await db.execute(update(MonitoredAccount), reactivate)
+        logger.info("Reactivated %d MT5 account(s)", len(reactivate))
+
+
 async def _close_positions_and_clear_credit(
     db: AsyncSession, mt5_login: str, reason: str
 ):
     """Close all positions, cancel all bonuses, then remove credit with verification."""
-    import asyncio as _asyncio
+    # Steps 1 and 2: closing positions only talks to MT5 and cancelling only
+    # touches the DB (plus leverage restores), so run them side by side.
+    # Both are awaited before re-raising so the session is never left in use.
+    results = await asyncio.gather(
+        _close_all_positions(mt5_login),
+        _cancel_all_bonuses_in_db(db, mt5_login, reason),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    # Step 3: Remove credit with verification, starting from the snapshot the
+    # position close was confirmed on
+    await _force_remove_credit(mt5_login, account=results[0])
+
+    # Unregister from monitoring if no bonuses left
+    await unregister_if_no_bonuses(db, mt5_login)
+
+
+async def _close_all_positions(mt5_login: str) -> Optional[MT5Account]:
+    """Close all open positions, trying up to 3 times until equity settles.
 
-    # Step 1: Close all open positions (try multiple times)
+    Returns the last account snapshot read while confirming.
+    """
+    acct = None
     for attempt in range(3):
         await gateway.close_all_positions(mt5_login)
-        await _asyncio.sleep(1.5)
-        # Check if positions are actually closed (equity should be ~balance+credit)
-        acct = await gateway.get_account_info(mt5_login)
-        if acct and abs(acct.equity - acct.balance - acct.credit) < 1.0:
+        # Positions are closed once equity is ~balance+credit; most closes settle
+        # well within the wait, so return on confirmation rather than sleeping.
+        acct = await gateway.wait_for_account(mt5_login, _positions_closed, timeout=1.5)
+        if acct and _positions_closed(acct):
             logger.info("Positions closed for %s (attempt %d)", mt5_login, attempt + 1)
-            break
+            return acct
         logger.warning(
             "Positions may still be open for %s: equity=%.2f, balance+credit=%.2f (attempt %d)",
             mt5_login, acct.equity if acct else 0, (acct.balance + acct.credit) if acct else 0, attempt + 1,
         )
-
-    # Step 2: Cancel all bonuses in DB
-    await _cancel_all_bonuses_in_db(db, mt5_login, reason)
-
-    # Step 3: Remove credit with verification
-    await _force_remove_credit(mt5_login)
-
-    # Unregister from monitoring if no bonuses left
-    await unregister_if_no_bonuses(db, mt5_login)
+    return acct
 
 
 async def _proportional_reduce_bonuses(
     db: AsyncSession, mt5_login: str, withdrawal_ratio: float, withdrawal_amount: float,
 ):
     """Reduce active bonuses proportionally instead of cancelling them outright."""
-    import math
-    from app.models.audit_log import ActorType, EventType
-    from app.services.audit_service import log_event
-
     active_bonuses = await _get_active_bonuses(db, mt5_login)
     if not active_bonuses:
         return
 
+    now = datetime.now(timezone.utc)
     for bonus in active_bonuses:
         old_credit = bonus.bonus_amount - bonus.amount_converted
         if old_credit <= 0.01:
@@ -357,7 +556,7 @@ async def _proportional_reduce_bonuses(
         if new_credit < 0.01:
             # Effectively zero — full cancel this bonus
             bonus.status = BonusStatus.CANCELLED
-            bonus.cancelled_at = datetime.now(timezone.utc)
+            bonus.cancelled_at = now
             bonus.cancellation_reason = f"withdrawal_full:{withdrawal_amount:.2f}"
             credit_reduction = old_credit
             new_credit = 0.0
@@ -385,13 +584,11 @@ async def _proportional_reduce_bonuses(
             account = await gateway.get_account_info(mt5_login)
             if account and account.balance > 0:
                 effective_pct = (new_credit / account.balance) * 100.0
-                multiplier = (effective_pct / 100.0) + 1.0
-                new_adjusted = math.floor(bonus.original_leverage / multiplier)
+                new_adjusted = calculate_adjusted_leverage(bonus.original_leverage, effective_pct)
                 await gateway.set_leverage(mt5_login, new_adjusted)
                 bonus.adjusted_leverage = new_adjusted
         elif bonus.bonus_type == "A" and new_credit <= 0.01 and bonus.original_leverage:
             # Credit fully gone — restore original leverage
-            from app.services.leverage_service import restore_leverage
             await restore_leverage(gateway, mt5_login, bonus.original_leverage)
             new_adjusted = bonus.original_leverage
 
@@ -429,52 +626,59 @@ async def _cancel_all_bonuses_in_db(
     db: AsyncSession, mt5_login: str, reason: str
 ):
     """Mark all active bonuses as cancelled in the DB."""
-    active_bonuses = await _get_active_bonuses(db, mt5_login)
+    # One UPDATE ... RETURNING both cancels the bonuses and hands back what the
+    # leverage restores and audit entries need, without a SELECT beforehand.
+    cancelled = (await db.execute(
+        update(Bonus)
+        .where(Bonus.mt5_login == mt5_login, Bonus.status == BonusStatus.ACTIVE)
+        .values(
+            status=BonusStatus.CANCELLED,
+            cancelled_at=datetime.now(timezone.utc),
+            cancellation_reason=reason,
+        )
+        .returning(Bonus.id, Bonus.campaign_id, Bonus.bonus_type,
+                   Bonus.bonus_amount, Bonus.original_leverage)
+    )).all()
+    if not cancelled:
+        return
 
-    now = datetime.now(timezone.utc)
-    for bonus in active_bonuses:
+    for bonus in cancelled:
         if bonus.bonus_type == "A" and bonus.original_leverage:
-            from app.services.leverage_service import restore_leverage
-            await restore_leverage(gateway, bonus.mt5_login, bonus.original_leverage)
-
-        bonus.status = BonusStatus.CANCELLED
-        bonus.cancelled_at = now
-        bonus.cancellation_reason = reason
-
-        from app.models.audit_log import ActorType, EventType
-        from app.services.audit_service import log_event
-        await log_event(
-            db,
-            event_type=EventType.CANCELLATION,
-            mt5_login=bonus.mt5_login,
-            campaign_id=bonus.campaign_id,
-            bonus_id=bonus.id,
-            actor_type=ActorType.SYSTEM,
-            before_state={"status": "active", "bonus_amount": bonus.bonus_amount},
-            after_state={"status": "cancelled", "reason": reason},
-        )
+            await restore_leverage(gateway, mt5_login, bonus.original_leverage)
 
-    await db.flush()
+    await log_events(db, [
+        {
+            "event_type": EventType.CANCELLATION,
+            "mt5_login": mt5_login,
+            "campaign_id": bonus.campaign_id,
+            "bonus_id": bonus.id,
+            "before_state": {"status": "active", "bonus_amount": bonus.bonus_amount},
+            "after_state": {"status": "cancelled", "reason": reason},
+        }
+        for bonus in cancelled
+    ])
 
 
-async def _force_remove_credit(mt5_login: str):
-    """Remove all credit from MT5 account, retrying and verifying after each attempt."""
-    import asyncio as _asyncio
+async def _force_remove_credit(mt5_login: str, account: Optional[MT5Account] = None):
+    """Remove all credit from MT5 account, retrying and verifying after each attempt.
 
+    `account` is a snapshot the caller has just read, saving the first fetch.
+    """
     for attempt in range(5):
-        account = await gateway.get_account_info(mt5_login)
+        if account is None:
+            account = await gateway.get_account_info(mt5_login)
         if not account or account.credit <= 0.01:
             logger.info("Credit cleared for %s (credit=%.2f)", mt5_login, account.credit if account else 0)
             return
 
         # If positions are still open (equity != balance + credit), close them first
-        if abs(account.equity - account.balance - account.credit) > 1.0:
+        if not _positions_closed(account):
             logger.info(
                 "Positions still open for %s before credit removal, closing... (attempt %d)",
                 mt5_login, attempt + 1,
             )
             await gateway.close_all_positions(mt5_login)
-            await _asyncio.sleep(2)
+            account = await gateway.wait_for_account(mt5_login, _positions_closed, timeout=2.0)
             continue
 
         logger.info(
@@ -485,22 +689,79 @@ async def _force_remove_credit(mt5_login: str):
             mt5_login, account.credit,
             "Bonus cancelled - credit removal",
         )
-        # Wait for MT5 to process, then verify
-        await _asyncio.sleep(1.5)
-
-        # Verify credit was actually removed
-        check = await gateway.get_account_info(mt5_login)
-        if check and check.credit <= 0.01:
+        # Resume as soon as MT5 reflects the removal instead of a fixed sleep
+        account = await gateway.wait_for_account(mt5_login, _credit_cleared, timeout=1.5)
+        if account and _credit_cleared(account):
             logger.info("Credit verified removed for %s", mt5_login)
             return
         logger.warning(
             "Credit removal not confirmed for %s: credit still %.2f (attempt %d)",
-            mt5_login, check.credit if check else -1, attempt + 1,
+            mt5_login, account.credit if account else -1, attempt + 1,
         )
 
     logger.error("Failed to remove credit for %s after 5 attempts", mt5_login)
 
 
+def _snapshot_key(account: MT5Account) -> tuple:
+    return round(account.balance, 2), round(account.equity, 2), round(account.credit, 2)
+
+
+def _is_idle(
+    mon: MonitoredAccount, account: MT5Account, active_types: Optional[Set[str]] = None,
+) -> bool:
+    """True when the snapshot is unchanged and nothing can be pending for the account.
+
+    Without credit that is always the case. With credit it needs the active
+    bonus types: credit backed only by Type A/B bonuses has no trades to
+    convert and is not orphaned, leaving just the drawdown check.
+    """
+    if _snapshot_key(account) != (
+        round(mon.last_balance, 2), round(mon.last_equity, 2), round(mon.last_credit, 2)
+    ):
+        return False
+    if account.credit <= 0.01:
+        return True
+    return (
+        bool(active_types)
+        and "C" not in active_types
+        and account.equity > account.credit + 0.01
+    )
+
+
+def _mark_polled(mon: MonitoredAccount, polled_at: datetime):
+    mon.last_polled_at = polled_at
+    mon.consecutive_errors = 0
+    mon.last_error = None
+
+
+def _positions_closed(account: MT5Account) -> bool:
+    return abs(account.equity - account.balance - account.credit) <= 1.0
+
+
+def _credit_cleared(account: MT5Account) -> bool:
+    return account.credit <= 0.01
+
+
+async def _load_active_bonus_types(db: AsyncSession, logins: List[str]) -> Dict[str, Set[str]]:
+    """Map each login to the types of its active bonuses, in one query.
+
+    Read from bonuses rather than kept as flags on MonitoredAccount: a flag
+    would have to be cleared on every path that ends a bonus (cancel, expiry,
+    conversion, withdrawal, admin actions), and a stale one would hide an
+    account's Type C bonus from the poll.
+    """
+    result = await db.execute(
+        select(Bonus.mt5_login, Bonus.bonus_type).where(
+            Bonus.status == BonusStatus.ACTIVE,
+            Bonus.mt5_login.in_(logins),
+        )
+    )
+    active_types: Dict[str, Set[str]] = defaultdict(set)
+    for login, bonus_type in result:
+        active_types[login].add(bonus_type)
+    return active_types
+
+
 async def _get_active_bonuses(db: AsyncSession, mt5_login: str):
     result = await db.execute(
         select(Bonus).where(
@@ -512,8 +773,9 @@ async def _get_active_bonuses(db: AsyncSession, mt5_login: str):
 
 
 async def _get_active_type_c_bonuses(db: AsyncSession, mt5_login: str):
+    # process_deals looks up each bonus's campaign; load them all in one IN query
     result = await db.execute(
-        select(Bonus).where(
+        select(Bonus).options(selectinload(Bonus.campaign)).where(
             Bonus.mt5_login == mt5_login,
             Bonus.status == BonusStatus.ACTIVE,
             Bonus.bonus_type == "C",
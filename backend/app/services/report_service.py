@@ -1,11 +1,11 @@
 from datetime import datetime
 from typing import Optional, List
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import Float, cast, select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.bonus import Bonus, BonusStatus
-from app.models.campaign import Campaign
+from app.services.campaign_cache import get_campaign_labels
 
 
 async def get_bonus_summary(
@@ -16,18 +16,17 @@ async def get_bonus_summary(
 ) -> List[dict]:
     query = (
         select(
-            Campaign.id,
-            Campaign.name,
-            Campaign.bonus_type,
+            Bonus.campaign_id,
             func.count(Bonus.id).label("total_issued"),
-            func.coalesce(func.sum(Bonus.bonus_amount), 0).label("total_amount"),
+            cast(func.coalesce(func.sum(Bonus.bonus_amount), 0), Float).label("total_amount"),
+            # Compiled as COUNT(...) FILTER (WHERE ...), so all four counts
+            # come from the same pass over the grouped rows
             func.count(Bonus.id).filter(Bonus.status == BonusStatus.ACTIVE).label("active_count"),
             func.count(Bonus.id).filter(Bonus.status == BonusStatus.CANCELLED).label("cancelled_count"),
             func.count(Bonus.id).filter(Bonus.status == BonusStatus.EXPIRED).label("expired_count"),
             func.count(Bonus.id).filter(Bonus.status == BonusStatus.CONVERTED).label("converted_count"),
         )
-        .join(Bonus, Bonus.campaign_id == Campaign.id)
-        .group_by(Campaign.id, Campaign.name, Campaign.bonus_type)
+        .group_by(Bonus.campaign_id)
     )
 
     if date_from:
@@ -35,22 +34,23 @@ async def get_bonus_summary(
     if date_to:
         query = query.where(Bonus.assigned_at <= date_to)
     if campaign_id:
-        query = query.where(Campaign.id == campaign_id)
+        query = query.where(Bonus.campaign_id == campaign_id)
 
     result = await db.execute(query)
-    rows = result.all()
+    rows = result.mappings().all()
+    campaigns = await get_campaign_labels(db, {r["campaign_id"] for r in rows})
 
     return [
         {
-            "campaign_id": r[0],
-            "campaign_name": r[1],
-            "bonus_type": r[2].value if r[2] else None,
-            "total_issued": r[3],
-            "total_amount": float(r[4]),
-            "active_count": r[5],
-            "cancelled_count": r[6],
-            "expired_count": r[7],
-            "converted_count": r[8],
+            "campaign_id": r["campaign_id"],
+            "campaign_name": campaigns[r["campaign_id"]][0],
+            "bonus_type": campaigns[r["campaign_id"]][1],
+            "total_issued": r["total_issued"],
+            "total_amount": r["total_amount"],
+            "active_count": r["active_count"],
+            "cancelled_count": r["cancelled_count"],
+            "expired_count": r["expired_count"],
+            "converted_count": r["converted_count"],
         }
         for r in rows
     ]
@@ -60,34 +60,39 @@ async def get_conversion_progress(
     db: AsyncSession,
     campaign_id: Optional[int] = None,
 ) -> List[dict]:
-    query = (
-        select(Bonus, Campaign.name)
-        .join(Campaign, Bonus.campaign_id == Campaign.id)
-        .where(Bonus.bonus_type == "C", Bonus.status == BonusStatus.ACTIVE)
-    )
+    query = select(
+        Bonus.id,
+        Bonus.mt5_login,
+        Bonus.campaign_id,
+        Bonus.bonus_amount,
+        func.coalesce(Bonus.lots_required, 0).label("lots_required"),
+        Bonus.lots_traded,
+        func.coalesce(
+            Bonus.lots_traded / func.nullif(Bonus.lots_required, 0) * 100, 0
+        ).label("percent_complete"),
+        Bonus.amount_converted,
+        (Bonus.bonus_amount - Bonus.amount_converted).label("amount_remaining"),
+    ).where(Bonus.bonus_type == "C", Bonus.status == BonusStatus.ACTIVE)
     if campaign_id:
         query = query.where(Bonus.campaign_id == campaign_id)
 
     result = await db.execute(query)
-    rows = result.all()
+    rows = result.mappings().all()
+    campaigns = await get_campaign_labels(db, {r["campaign_id"] for r in rows})
 
     return [
         {
-            "bonus_id": bonus.id,
-            "mt5_login": bonus.mt5_login,
-            "campaign_name": name,
-            "bonus_amount": bonus.bonus_amount,
-            "lots_required": bonus.lots_required or 0,
-            "lots_traded": bonus.lots_traded,
-            "percent_complete": (
-                (bonus.lots_traded / bonus.lots_required * 100)
-                if bonus.lots_required
-                else 0
-            ),
-            "amount_converted": bonus.amount_converted,
-            "amount_remaining": bonus.bonus_amount - bonus.amount_converted,
+            "bonus_id": r["id"],
+            "mt5_login": r["mt5_login"],
+            "campaign_name": campaigns[r["campaign_id"]][0],
+            "bonus_amount": r["bonus_amount"],
+            "lots_required": r["lots_required"],
+            "lots_traded": r["lots_traded"],
+            "percent_complete": r["percent_complete"],
+            "amount_converted": r["amount_converted"],
+            "amount_remaining": r["amount_remaining"],
         }
-        for bonus, name in rows
+        for r in rows
     ]
 
 
@@ -96,49 +101,76 @@ async def get_cancellation_report(
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
 ) -> List[dict]:
-    query = (
-        select(Bonus, Campaign.name)
-        .join(Campaign, Bonus.campaign_id == Campaign.id)
-        .where(Bonus.status == BonusStatus.CANCELLED)
-    )
+    query = select(
+        Bonus.id,
+        Bonus.mt5_login,
+        Bonus.campaign_id,
+        Bonus.bonus_amount,
+        func.coalesce(Bonus.cancellation_reason, "unknown").label("reason"),
+        Bonus.cancelled_at,
+    ).where(Bonus.status == BonusStatus.CANCELLED)
     if date_from:
         query = query.where(Bonus.cancelled_at >= date_from)
     if date_to:
         query = query.where(Bonus.cancelled_at <= date_to)
 
     result = await db.execute(query)
-    rows = result.all()
+    rows = result.mappings().all()
+    campaigns = await get_campaign_labels(db, {r["campaign_id"] for r in rows})
 
     return [
         {
-            "bonus_id": bonus.id,
-            "mt5_login": bonus.mt5_login,
-            "campaign_name": name,
-            "bonus_amount": bonus.bonus_amount,
-            "reason": bonus.cancellation_reason or "unknown",
-            "cancelled_at": bonus.cancelled_at.isoformat() if bonus.cancelled_at else None,
+            "bonus_id": r["id"],
+            "mt5_login": r["mt5_login"],
+            "campaign_name": campaigns[r["campaign_id"]][0],
+            "bonus_amount": r["bonus_amount"],
+            "reason": r["reason"],
+            "cancelled_at": r["cancelled_at"].isoformat() if r["cancelled_at"] else None,
         }
-        for bonus, name in rows
+        for r in rows
     ]
 
 
-async def get_leverage_report(db: AsyncSession) -> List[dict]:
+async def get_leverage_report(
+    db: AsyncSession,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    """Type A leverage adjustments, ordered by bonus id.
+
+    With `limit`, returns one page; pass the last `bonus_id` of a page as
+    `after_id` to get the next one (keyset pagination, so deep pages cost
+    the same as the first).
+    """
     query = (
-        select(Bonus, Campaign.name)
-        .join(Campaign, Bonus.campaign_id == Campaign.id)
+        select(
+            Bonus.id,
+            Bonus.mt5_login,
+            Bonus.campaign_id,
+            Bonus.original_leverage,
+            Bonus.adjusted_leverage,
+            Bonus.status,
+        )
         .where(Bonus.bonus_type == "A", Bonus.original_leverage.isnot(None))
+        .order_by(Bonus.id)
     )
+    if after_id is not None:
+        query = query.where(Bonus.id > after_id)
+    if limit:
+        query = query.limit(limit)
+
     result = await db.execute(query)
-    rows = result.all()
+    rows = result.mappings().all()
+    campaigns = await get_campaign_labels(db, {r["campaign_id"] for r in rows})
 
     return [
         {
-            "bonus_id": bonus.id,
-            "mt5_login": bonus.mt5_login,
-            "campaign_name": name,
-            "original_leverage": bonus.original_leverage,
-            "adjusted_leverage": bonus.adjusted_leverage,
-            "status": bonus.status.value,
+            "bonus_id": r["id"],
+            "mt5_login": r["mt5_login"],
+            "campaign_name": campaigns[r["campaign_id"]][0],
+            "original_leverage": r["original_leverage"],
+            "adjusted_leverage": r["adjusted_leverage"],
+            "status": r["status"].value,
         }
-        for bonus, name in rows
+        for r in rows
     ]
@@ -1,12 +1,18 @@
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.campaign import Campaign, CampaignStatus, TriggerType
+from app.models.campaign import Campaign, TriggerType
+from app.models.monitored_account import MonitoredAccount
 from app.models.trigger import TriggerEvent, TriggerStatus
-from app.services.bonus_engine import assign_bonus, check_eligibility
+from app.services.bonus_engine import EligibilityContext, assign_bonus, check_eligibility
+from app.services.campaign_cache import (
+    get_active_campaigns,
+    get_active_campaigns_for_agent_code,
+    get_active_campaigns_for_trigger,
+)
 
 
 async def process_deposit_trigger(
@@ -14,58 +20,53 @@ async def process_deposit_trigger(
     mt5_login: str,
     deposit_amount: float,
     agent_code: Optional[str] = None,
+    monitored: Optional[MonitoredAccount] = None,
 ) -> List[dict]:
     results = []
+    trigger_events: List[dict] = []
 
-    # Collect all matching campaigns: auto_deposit + agent_code (via lead source)
-    seen_ids: set[int] = set()
+    # Collect all matching campaigns: auto_deposit first, then agent_code
+    # (via lead source), both from the cache's indexes
     campaigns: List[Campaign] = []
-
-    for c in await _get_active_campaigns_for_trigger("auto_deposit", db):
-        if c.id in seen_ids:
-            continue
+    for c in await get_active_campaigns_for_trigger("auto_deposit"):
         # If this campaign also has agent_codes configured, it requires a matching
         # lead source — skip it if the account has no lead source or doesn't match.
         if c.agent_codes:
             if not agent_code or agent_code not in c.agent_codes:
                 continue
-        seen_ids.add(c.id)
         campaigns.append(c)
-
     if agent_code:
-        for c in await _get_active_campaigns_for_trigger("agent_code", db):
-            if c.id not in seen_ids and c.agent_codes and agent_code in c.agent_codes:
-                seen_ids.add(c.id)
-                campaigns.append(c)
+        campaigns.extend(
+            c for c in await get_active_campaigns_for_agent_code(agent_code)
+            if "auto_deposit" not in c.trigger_types  # Already handled above
+        )
 
+    ctx = await EligibilityContext.load(db, mt5_login) if campaigns else None
+    now = datetime.now(timezone.utc)  # One processed_at for the whole event
     for campaign in campaigns:
-        eligible, reason = await check_eligibility(db, campaign, mt5_login, deposit_amount)
-
-        trigger_event = TriggerEvent(
-            campaign_id=campaign.id,
-            mt5_login=mt5_login,
-            trigger_type="agent_code" if (agent_code and campaign.agent_codes and agent_code in campaign.agent_codes) else "auto_deposit",
-            event_data={"deposit_amount": deposit_amount, "agent_code": agent_code},
-        )
+        eligible, reason = await check_eligibility(db, campaign, mt5_login, deposit_amount, ctx=ctx)
 
         if eligible:
             try:
-                bonus = await assign_bonus(db, campaign, mt5_login, deposit_amount)
-                trigger_event.status = TriggerStatus.PROCESSED
-                trigger_event.processed_at = datetime.now(timezone.utc)
-                results.append({"campaign_id": campaign.id, "bonus_id": bonus.id, "status": "assigned"})
+                bonus = await assign_bonus(
+                    db, campaign, mt5_login, deposit_amount, monitored=monitored,
+                )
+                ctx.record_assignment(bonus)
+                result = {"campaign_id": campaign.id, "bonus_id": bonus.id, "status": "assigned"}
             except Exception as e:
-                trigger_event.status = TriggerStatus.FAILED
-                trigger_event.skip_reason = str(e)
-                results.append({"campaign_id": campaign.id, "status": "failed", "error": str(e)})
+                result = {"campaign_id": campaign.id, "status": "failed", "error": str(e)}
         else:
-            trigger_event.status = TriggerStatus.SKIPPED
-            trigger_event.skip_reason = reason
-            results.append({"campaign_id": campaign.id, "status": "skipped", "reason": reason})
+            result = {"campaign_id": campaign.id, "status": "skipped", "reason": reason}
 
-        db.add(trigger_event)
+        results.append(result)
+        trigger_events.append(_trigger_event_row(
+            result, mt5_login,
+            trigger_type="agent_code" if (agent_code and campaign.agent_codes and agent_code in campaign.agent_codes) else "auto_deposit",
+            event_data={"deposit_amount": deposit_amount, "agent_code": agent_code},
+            processed_at=now,
+        ))
 
-    await db.flush()
+    await _record_trigger_events(db, trigger_events)
     return results
 
 
@@ -74,36 +75,33 @@ async def process_registration_trigger(
     mt5_login: str,
 ) -> List[dict]:
     results = []
-    campaigns = await _get_active_campaigns_for_trigger("registration", db)
+    trigger_events: List[dict] = []
+    campaigns = await _get_active_campaigns_for_trigger("registration")
 
+    ctx = await EligibilityContext.load(db, mt5_login) if campaigns else None
+    now = datetime.now(timezone.utc)  # One processed_at for the whole event
     for campaign in campaigns:
-        eligible, reason = await check_eligibility(db, campaign, mt5_login)
-
-        trigger_event = TriggerEvent(
-            campaign_id=campaign.id,
-            mt5_login=mt5_login,
-            trigger_type="registration",
-            event_data={},
-        )
+        eligible, reason = await check_eligibility(db, campaign, mt5_login, ctx=ctx)
 
         if eligible:
             try:
                 bonus = await assign_bonus(db, campaign, mt5_login, deposit_amount=0)
-                trigger_event.status = TriggerStatus.PROCESSED
-                trigger_event.processed_at = datetime.now(timezone.utc)
-                results.append({"campaign_id": campaign.id, "bonus_id": bonus.id, "status": "assigned"})
+                ctx.record_assignment(bonus)
+                result = {"campaign_id": campaign.id, "bonus_id": bonus.id, "status": "assigned"}
             except Exception as e:
-                trigger_event.status = TriggerStatus.FAILED
-                trigger_event.skip_reason = str(e)
-                results.append({"campaign_id": campaign.id, "status": "failed", "error": str(e)})
+                result = {"campaign_id": campaign.id, "status": "failed", "error": str(e)}
         else:
-            trigger_event.status = TriggerStatus.SKIPPED
-            trigger_event.skip_reason = reason
-            results.append({"campaign_id": campaign.id, "status": "skipped", "reason": reason})
+            result = {"campaign_id": campaign.id, "status": "skipped", "reason": reason}
 
-        db.add(trigger_event)
+        results.append(result)
+        trigger_events.append(_trigger_event_row(
+            result, mt5_login,
+            trigger_type="registration",
+            event_data={},
+            processed_at=now,
+        ))
 
-    await db.flush()
+    await _record_trigger_events(db, trigger_events)
     return results
 
 
@@ -114,48 +112,71 @@ async def process_promo_code_trigger(
     deposit_amount: Optional[float] = None,
 ) -> List[dict]:
     results = []
-    query = select(Campaign).where(
-        Campaign.status == CampaignStatus.ACTIVE,
-        Campaign.promo_code == promo_code,
-    )
-    result = await db.execute(query)
-    campaigns = result.scalars().all()
+    trigger_events: List[dict] = []
+    campaigns = [c for c in await get_active_campaigns() if c.promo_code == promo_code]
 
+    ctx = await EligibilityContext.load(db, mt5_login) if campaigns else None
+    now = datetime.now(timezone.utc)  # One processed_at for the whole event
     for campaign in campaigns:
-        eligible, reason = await check_eligibility(db, campaign, mt5_login, deposit_amount)
-
-        trigger_event = TriggerEvent(
-            campaign_id=campaign.id,
-            mt5_login=mt5_login,
-            trigger_type="promo_code",
-            event_data={"promo_code": promo_code, "deposit_amount": deposit_amount},
-        )
+        eligible, reason = await check_eligibility(db, campaign, mt5_login, deposit_amount, ctx=ctx)
 
         if eligible:
             try:
                 bonus = await assign_bonus(db, campaign, mt5_login, deposit_amount)
-                trigger_event.status = TriggerStatus.PROCESSED
-                trigger_event.processed_at = datetime.now(timezone.utc)
-                results.append({"campaign_id": campaign.id, "bonus_id": bonus.id, "status": "assigned"})
+                ctx.record_assignment(bonus)
+                result = {"campaign_id": campaign.id, "bonus_id": bonus.id, "status": "assigned"}
             except Exception as e:
-                trigger_event.status = TriggerStatus.FAILED
-                trigger_event.skip_reason = str(e)
-                results.append({"campaign_id": campaign.id, "status": "failed", "error": str(e)})
+                result = {"campaign_id": campaign.id, "status": "failed", "error": str(e)}
         else:
-            trigger_event.status = TriggerStatus.SKIPPED
-            trigger_event.skip_reason = reason
-            results.append({"campaign_id": campaign.id, "status": "skipped", "reason": reason})
+            result = {"campaign_id": campaign.id, "status": "skipped", "reason": reason}
 
-        db.add(trigger_event)
+        results.append(result)
+        trigger_events.append(_trigger_event_row(
+            result, mt5_login,
+            trigger_type="promo_code",
+            event_data={"promo_code": promo_code, "deposit_amount": deposit_amount},
+            processed_at=now,
+        ))
 
-    await db.flush()
+    await _record_trigger_events(db, trigger_events)
     return results
 
 
-async def _get_active_campaigns_for_trigger(
-    trigger_type: str, db: AsyncSession
-) -> List[Campaign]:
-    query = select(Campaign).where(Campaign.status == CampaignStatus.ACTIVE)
-    result = await db.execute(query)
-    all_active = result.scalars().all()
-    return [c for c in all_active if trigger_type in (c.trigger_types or [])]
+def _trigger_event_row(
+    result: dict,
+    mt5_login: str,
+    trigger_type: str,
+    event_data: dict,
+    processed_at: datetime,
+) -> dict:
+    """Build the trigger_events row for one campaign's final result.
+
+    Every row carries the same keys, so _record_trigger_events can send a
+    trigger's events as a single executemany batch.
+    """
+    if result["status"] == "assigned":
+        status, skip_reason = TriggerStatus.PROCESSED, None
+    elif result["status"] == "failed":
+        status, skip_reason = TriggerStatus.FAILED, result["error"]
+    else:
+        status, skip_reason = TriggerStatus.SKIPPED, result["reason"]
+    return {
+        "campaign_id": result["campaign_id"],
+        "mt5_login": mt5_login,
+        "trigger_type": trigger_type,
+        "event_data": event_data,
+        "status": status,
+        "skip_reason": skip_reason,
+        "processed_at": processed_at if status == TriggerStatus.PROCESSED else None,
+    }
+
+
+async def _record_trigger_events(db: AsyncSession, trigger_events: List[dict]):
+    """Insert a trigger's events with one executemany INSERT, skipping ORM objects."""
+    if trigger_events:
+        await db.execute(insert(TriggerEvent), trigger_events)
+
+
+async def _get_active_campaigns_for_trigger(trigger_type: str) -> List[Campaign]:
+    # Served from the in-process campaign cache, already grouped by trigger type
+    return await get_active_campaigns_for_trigger(trigger_type)
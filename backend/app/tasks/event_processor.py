@@ -1,30 +1,23 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.gateway import gateway
 from app.gateway.interface import MT5Deal
 from app.models.bonus import Bonus, BonusStatus
-from app.services.lot_tracker import handle_withdrawal, process_deal
+from app.services.bonus_engine import cancel_bonus
+from app.services.lot_tracker import handle_withdrawal, process_deals
+from app.services.monitor_service import _get_active_type_c_bonuses, _proportional_reduce_bonuses
 
 
 async def process_deal_event(db: AsyncSession, deal: MT5Deal):
-    result = await db.execute(
-        select(Bonus).where(
-            Bonus.mt5_login == deal.login,
-            Bonus.status == BonusStatus.ACTIVE,
-            Bonus.bonus_type == "C",
-        )
-    )
-    bonuses = result.scalars().all()
-
-    for bonus in bonuses:
-        await process_deal(db, bonus, deal)
+    bonuses = await _get_active_type_c_bonuses(db, deal.login)
+    await process_deals(db, bonuses, [deal])
 
 
 async def process_withdrawal_event(db: AsyncSession, mt5_login: str, amount: float):
-    from app.services.monitor_service import _proportional_reduce_bonuses, _get_active_bonuses
-    from app.gateway import gateway
-
-    # Calculate withdrawal ratio from current MT5 balance
+    # Calculate withdrawal ratio from current MT5 balance. Read it uncached:
+    # the withdrawal happened outside this app, so nothing has invalidated a
+    # cached pre-withdrawal snapshot, which would count the amount twice.
     account = await gateway.get_account_info(mt5_login)
     if account:
         balance_before = account.balance + amount  # reconstruct pre-withdrawal balance
@@ -33,8 +26,9 @@ async def process_withdrawal_event(db: AsyncSession, mt5_login: str, amount: flo
         withdrawal_ratio = 1.0
 
     if withdrawal_ratio >= 1.0:
-        # Full withdrawal — cancel everything
-        from app.services.bonus_engine import cancel_bonus
+        # Full withdrawal — cancel everything. Kept sequential in one session:
+        # cancel_bonus ends with unregister_if_no_bonuses, which has to see
+        # the other cancellations of this login.
         result = await db.execute(
             select(Bonus).where(
                 Bonus.mt5_login == mt5_login,
@@ -4,23 +4,49 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.bonus import Bonus, BonusStatus
+from app.services.account_locks import login_lock
 from app.services.bonus_engine import expire_bonus
 
+EXPIRY_BATCH_SIZE = 500
+
 
 async def check_expired_bonuses(db: AsyncSession):
+    """Expire overdue bonuses, loading them in id-ordered chunks.
+
+    Expiring goes through cancel_bonus (credit removal, leverage restore,
+    audit, unregister), so each bonus is still handled individually, under
+    its account's lock and committed before the lock is released. Keyset
+    paging keeps memory bounded however large the backlog is.
+    """
     now = datetime.now(timezone.utc)
-    result = await db.execute(
-        select(Bonus).where(
-            Bonus.status == BonusStatus.ACTIVE,
-            Bonus.expires_at.isnot(None),
-            Bonus.expires_at <= now,
+    count = 0
+    last_id = 0
+    while True:
+        # Only the keys are read up front; the full row is loaded under the
+        # account's lock, where it's needed anyway
+        result = await db.execute(
+            select(Bonus.id, Bonus.mt5_login).where(
+                Bonus.status == BonusStatus.ACTIVE,
+                Bonus.expires_at.isnot(None),
+                Bonus.expires_at <= now,
+                Bonus.id > last_id,
+            ).order_by(Bonus.id).limit(EXPIRY_BATCH_SIZE)
         )
-    )
-    expired = result.scalars().all()
+        expired = result.all()
+        if not expired:
+            break
 
-    count = 0
-    for bonus in expired:
-        await expire_bonus(db, bonus)
-        count += 1
+        for bonus_id, mt5_login in expired:
+            async with login_lock(mt5_login):
+                # Re-read: the monitor may have cancelled it since the chunk was read
+                bonus = await db.get(Bonus, bonus_id, populate_existing=True)
+                if bonus is None or bonus.status != BonusStatus.ACTIVE:
+                    continue
+                await expire_bonus(db, bonus)
+                await db.commit()
+            count += 1
+        if len(expired) < EXPIRY_BATCH_SIZE:
+            break  # Short chunk: nothing left past it
+        last_id = expired[-1].id
 
     return count
@@ -1,20 +1,38 @@
+import asyncio
 import logging
+from typing import Optional
+
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
+from app.config.settings import settings
 from app.db.database import async_session
+from app.gateway import gateway
+from app.services.monitor_service import run_monitor_cycle
 from app.tasks.expiry_checker import check_expired_bonuses
 
 logger = logging.getLogger(__name__)
 
-scheduler = AsyncIOScheduler()
+# Jobs are re-added on every start, so there's nothing to persist; keeping the
+# job store in memory spares the database the scheduler's bookkeeping writes.
+scheduler = AsyncIOScheduler(
+    jobstores={"default": MemoryJobStore()},
+    job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 5},
+)
+
+# Seconds between monitor cycles for gateways that can't report changes
+MONITOR_POLL_INTERVAL_SECONDS = 0.3
+
+_monitor_task: Optional[asyncio.Task] = None
 
 
 async def _run_expiry_check():
     try:
         async with async_session() as db:
+            # Each expiry is committed as it happens; closing the session
+            # just ends the final read-only transaction
             count = await check_expired_bonuses(db)
-            await db.commit()
             if count > 0:
                 logger.info(f"Expired {count} bonus(es)")
     except Exception:
@@ -22,17 +40,40 @@ async def _run_expiry_check():
 
 
 async def _run_monitor_cycle():
-    from app.services.monitor_service import run_monitor_cycle
     try:
         async with async_session() as db:
             summary = await run_monitor_cycle(db)
-            await db.commit()
+            # A cycle with nothing to poll never touches the database, so
+            # there's no transaction to commit
+            if db.in_transaction():
+                await db.commit()
             if any(v > 0 for k, v in summary.items() if k != "total"):
                 logger.info("Monitor cycle: %s", summary)
     except Exception:
         logger.exception("Monitor cycle failed")
 
 
+async def _monitor_loop():
+    """Run monitor cycles back to back, one at a time.
+
+    Push-capable gateways wake the loop as soon as an account changes, so an
+    idle system sleeps instead of opening a session every 0.3s; the idle
+    timeout keeps the periodic full sweep going. Other gateways are polled
+    every MONITOR_POLL_INTERVAL_SECONDS as before.
+    """
+    if gateway.pushes_changes:
+        timeout = settings.MONITOR_IDLE_WAKE_SECONDS
+    else:
+        timeout = MONITOR_POLL_INTERVAL_SECONDS
+    while True:
+        await _run_monitor_cycle()
+        await gateway.wait_for_changes(timeout)
+
+
+def monitor_running() -> bool:
+    return _monitor_task is not None and not _monitor_task.done()
+
+
 def start_scheduler():
     scheduler.add_job(
         _run_expiry_check,
@@ -41,19 +82,20 @@ def start_scheduler():
         name="Check expired bonuses",
         replace_existing=True,
     )
-    scheduler.add_job(
-        _run_monitor_cycle,
-        trigger=IntervalTrigger(seconds=0.3),
-        id="account_monitor",
-        name="Monitor accounts",
-        replace_existing=True,
-        max_instances=1,
-        coalesce=True,
-    )
     scheduler.start()
-    logger.info("Background scheduler started (expiry + monitor @0.3s)")
+
+    global _monitor_task
+    _monitor_task = asyncio.create_task(_monitor_loop())
+    logger.info("Background scheduler started (expiry + monitor)")
 
 
-def stop_scheduler():
+async def stop_scheduler():
+    global _monitor_task
+    if _monitor_task is not None:
+        _monitor_task.cancel()
+        # Let the in-flight cycle unwind (rollback, session close) before the
+        # gateway is disconnected underneath it
+        await asyncio.gather(_monitor_task, return_exceptions=True)
+        _monitor_task = None
     scheduler.shutdown(wait=False)
     logger.info("Background scheduler stopped")
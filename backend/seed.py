@@ -1,8 +1,9 @@
 """Seed script to create initial admin user and test data."""
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config.security import hash_password
@@ -24,42 +25,52 @@ async def seed():
             print("Seed data already exists, skipping.")
             return
 
-        # Create admin users
+        # bcrypt is CPU-bound, so hash the passwords in parallel worker
+        # processes rather than one after another on the event loop
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor() as pool:
+            admin_hash, manager_hash, support_hash, viewer_hash = await asyncio.gather(*(
+                loop.run_in_executor(pool, hash_password, password)
+                for password in ("admin123", "manager123", "support123", "viewer123")
+            ))
+
+        # Create admin users in one multi-row INSERT; RETURNING hands back
+        # their ids in row order
         users = [
-            AdminUser(
+            dict(
                 email="admin@mt5bonus.com",
-                password_hash=hash_password("admin123"),
+                password_hash=admin_hash,
                 full_name="Super Admin",
                 role=AdminRole.SUPER_ADMIN,
             ),
-            AdminUser(
+            dict(
                 email="manager@mt5bonus.com",
-                password_hash=hash_password("manager123"),
+                password_hash=manager_hash,
                 full_name="Campaign Manager",
                 role=AdminRole.CAMPAIGN_MANAGER,
             ),
-            AdminUser(
+            dict(
                 email="support@mt5bonus.com",
-                password_hash=hash_password("support123"),
+                password_hash=support_hash,
                 full_name="Support Agent",
                 role=AdminRole.SUPPORT_AGENT,
             ),
-            AdminUser(
+            dict(
                 email="viewer@mt5bonus.com",
-                password_hash=hash_password("viewer123"),
+                password_hash=viewer_hash,
                 full_name="Read Only User",
                 role=AdminRole.READ_ONLY,
             ),
         ]
-        for u in users:
-            db.add(u)
-        await db.flush()
-
-        admin = users[0]
+        result = await db.execute(
+            insert(AdminUser).returning(AdminUser.id, sort_by_parameter_order=True),
+            users,
+        )
+        admin_id = result.scalars().first()
 
-        # Create sample campaigns
+        # Create sample campaigns, also as a single INSERT
         campaigns = [
-            Campaign(
+            dict(
                 name="Welcome Bonus 100%",
                 status=CampaignStatus.ACTIVE,
                 bonus_type=BonusType.TYPE_B,
@@ -72,9 +83,9 @@ async def seed():
                 one_bonus_per_account=True,
                 max_concurrent_bonuses=1,
                 notes="Welcome bonus for new accounts",
-                created_by_id=admin.id,
+                created_by_id=admin_id,
             ),
-            Campaign(
+            dict(
                 name="VIP Leverage Boost 50%",
                 status=CampaignStatus.ACTIVE,
                 bonus_type=BonusType.TYPE_A,
@@ -87,9 +98,9 @@ async def seed():
                 max_concurrent_bonuses=2,
                 expiry_days=90,
                 notes="VIP dynamic leverage bonus",
-                created_by_id=admin.id,
+                created_by_id=admin_id,
             ),
-            Campaign(
+            dict(
                 name="Trade & Earn Convertible",
                 status=CampaignStatus.ACTIVE,
                 bonus_type=BonusType.TYPE_C,
@@ -104,9 +115,9 @@ async def seed():
                 max_concurrent_bonuses=1,
                 expiry_days=60,
                 notes="Convertible bonus - trade 10 lots to convert",
-                created_by_id=admin.id,
+                created_by_id=admin_id,
             ),
-            Campaign(
+            dict(
                 name="Promo Code Special",
                 status=CampaignStatus.ACTIVE,
                 bonus_type=BonusType.TYPE_B,
@@ -118,9 +129,9 @@ async def seed():
                 one_bonus_per_account=True,
                 max_concurrent_bonuses=2,
                 notes="200% bonus with promo code BONUS200",
-                created_by_id=admin.id,
+                created_by_id=admin_id,
             ),
-            Campaign(
+            dict(
                 name="IB Referral Bonus",
                 status=CampaignStatus.DRAFT,
                 bonus_type=BonusType.TYPE_B,
@@ -131,11 +142,10 @@ async def seed():
                 one_bonus_per_account=True,
                 max_concurrent_bonuses=1,
                 notes="Agent/IB referral bonus - draft",
-                created_by_id=admin.id,
+                created_by_id=admin_id,
             ),
         ]
-        for c in campaigns:
-            db.add(c)
+        await db.execute(insert(Campaign), campaigns)
 
         await db.commit()
         print("Seed data created successfully!")
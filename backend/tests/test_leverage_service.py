@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from app.services.leverage_service import calculate_adjusted_leverage, calculate_adjusted_leverage_bps
+
+
+def _float_adjusted_leverage(original_leverage: int, bonus_percentage: float) -> int:
+    """The float formula calculate_adjusted_leverage used before it went integer."""
+    return math.floor(original_leverage / ((bonus_percentage / 100.0) + 1.0))
+
+
+@pytest.mark.parametrize("original_leverage", [1, 10, 50, 100, 200, 300, 400, 500, 1000, 2000])
+@pytest.mark.parametrize("bonus_percentage", [5, 10, 12.5, 20, 25, 30, 33, 50, 75, 100, 150, 200])
+def test_matches_float_formula(original_leverage, bonus_percentage):
+    assert calculate_adjusted_leverage(original_leverage, bonus_percentage) == (
+        _float_adjusted_leverage(original_leverage, bonus_percentage)
+    )
+
+
+@pytest.mark.parametrize("original_leverage, bonus_percentage, expected", [
+    (28, 12, 25),
+    (33, 10, 30),
+    (55, 10, 50),
+    (66, 120, 30),
+])
+def test_exact_quotients_are_not_misrounded(original_leverage, bonus_percentage, expected):
+    # The float division lands just below the exact quotient and floors one short
+    assert _float_adjusted_leverage(original_leverage, bonus_percentage) == expected - 1
+    assert calculate_adjusted_leverage(original_leverage, bonus_percentage) == expected
+
+
+def test_only_exact_quotients_differ_from_float_formula():
+    for original_leverage in range(1, 1001):
+        for bonus_percentage in range(1, 301):
+            adjusted = calculate_adjusted_leverage(original_leverage, bonus_percentage)
+            old = _float_adjusted_leverage(original_leverage, bonus_percentage)
+            if adjusted != old:
+                assert (original_leverage * 100) % (100 + bonus_percentage) == 0
+                assert adjusted == old + 1
+
+
+def test_bps():
+    assert calculate_adjusted_leverage_bps(500, 5000) == 333
+    assert calculate_adjusted_leverage_bps(500, 1250) == 444
+    assert calculate_adjusted_leverage_bps(500, 0) == 500